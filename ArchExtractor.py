@@ -1,276 +1,557 @@
 import os
 import sys
 import struct
-import zlib
+import array
+import mmap
 import argparse
+import logging
+import functools
 import string
-import re
+import queue
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Tuple, Set, Dict, NamedTuple, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+try:
+    # Optional ISA-L bindings: drop-in zlib API with a much faster inflate
+    from isal import isal_zlib as zlib
+except ImportError:
+    import zlib
 
 # Constants for compression methods
 COM_METHOD_RAW = 0
 COM_METHOD_ZLIB = 9
 
+# Buffer size for extracted file writes
+IO_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Worker threads used to inflate zlib blocks
+DECOMPRESS_WORKERS = min(4, os.cpu_count() or 1)
+
+# Archives extracted at once in batch mode; each one inflates on its own DECOMPRESS_WORKERS threads
+BATCH_WORKERS = max(1, (os.cpu_count() or 1) // DECOMPRESS_WORKERS)
+
+# Blocks being inflated ahead of the writer, so a file is never held in memory whole
+INFLATE_WINDOW = 2 * DECOMPRESS_WORKERS
+
+# Bytes of extracted data that may wait for the writer thread before extraction blocks
+WRITE_QUEUE_BYTES = 64 * 1024 * 1024
+
 # Pre-compile struct formats for better performance
 HEADER_STRUCT = struct.Struct('<' + 'I' * 12)  # 12 DWORDs
-FILE_ENTRY_STRUCT = struct.Struct('<' + 'I' * 8)  # 8 DWORDs
-FOLDER_ENTRY_STRUCT = struct.Struct('<' + 'I' * 4)  # 4 DWORDs
 BLOCK_HEADER_STRUCT = struct.Struct('<II')  # For decompression blocks
 
+log = logging.getLogger(__name__)
+
+VALID_FILENAME_CHARS = frozenset("-_.() %s%s" % (string.ascii_letters, string.digits))
+
+class _FilenameTranslation(dict):
+    """
+    str.translate table mapping every character outside VALID_FILENAME_CHARS to '_'.
+    Entries are filled in on first use, so any code point is handled.
+    """
+    def __missing__(self, code_point: int) -> int:
+        value = code_point if chr(code_point) in VALID_FILENAME_CHARS else ord('_')
+        self[code_point] = value
+        return value
+
+FILENAME_TRANSLATION = _FilenameTranslation()
+
 # Define the header structure
-class TArchFileHeader:
-    __slots__ = ('Marker', 'Version', 'NameTableSize', 'FolderCount', 'FileCount', 'Unk')
-    
-    def __init__(self, data: bytes):
-        if len(data) != 48:  # 12 DWORDs * 4 bytes
+class TArchFileHeader(NamedTuple):
+    Marker: int
+    Version: int
+    NameTableSize: int
+    FolderCount: int
+    FileCount: int
+    Unk: Tuple[int, ...]
+
+    @classmethod
+    def from_buffer(cls, buffer, offset: int = 0) -> 'TArchFileHeader':
+        if len(buffer) - offset < 48:  # 12 DWORDs * 4 bytes
             raise ValueError("Invalid TArchFileHeader size. Expected 48 bytes.")
-        unpacked = HEADER_STRUCT.unpack(data)
-        self.Marker = unpacked[0]
-        self.Version = unpacked[1]
-        self.NameTableSize = unpacked[2]
-        self.FolderCount = unpacked[3]
-        self.FileCount = unpacked[4]
-        self.Unk = unpacked[5:12]
-
-# Define the file entry structure
-class TArchFileEntry:
-    __slots__ = ('NameOffset', 'FileOffset', 'FileOffsetPad', 'ComFileSize', 
+        unpacked = HEADER_STRUCT.unpack_from(buffer, offset)
+        return cls(*unpacked[:5], unpacked[5:12])
+
+def unpack_dword_columns(buffer, offset: int, count: int, field_count: int) -> List[array.array]:
+    """
+    Splits a packed table of count little-endian DWORD records starting at
+    offset in buffer into one array per field.
+    """
+    values = array.array('I')
+    values.frombytes(memoryview(buffer)[offset:offset + 4 * field_count * count])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return [values[i::field_count] for i in range(field_count)]
+
+# Define the file entry table, stored column-wise (one array per field)
+class TArchFileTable:
+    __slots__ = ('NameOffset', 'FileOffset', 'FileOffsetPad', 'ComFileSize',
                  'ComFileSizePad', 'RawFileSize', 'RawFileSizePad', 'ComMethod')
-    
-    def __init__(self, data: bytes):
-        if len(data) != 32:  # 8 DWORDs * 4 bytes
-            raise ValueError("Invalid TArchFileEntry size. Expected 32 bytes.")
-        unpacked = FILE_ENTRY_STRUCT.unpack(data)
-        self.NameOffset = unpacked[0]
-        self.FileOffset = unpacked[1]
-        self.FileOffsetPad = unpacked[2]
-        self.ComFileSize = unpacked[3]
-        self.ComFileSizePad = unpacked[4]
-        self.RawFileSize = unpacked[5]
-        self.RawFileSizePad = unpacked[6]
-        self.ComMethod = unpacked[7]
-
-# Define the folder entry structure
-class TArchFolderEntry:
+
+    def __init__(self, buffer, offset: int, count: int):
+        if len(buffer) - offset < 32 * count:  # 8 DWORDs * 4 bytes per entry
+            raise ValueError(f"Invalid TArchFileEntry table size. Expected {32 * count} bytes.")
+        (self.NameOffset,
+         self.FileOffset,
+         self.FileOffsetPad,
+         self.ComFileSize,
+         self.ComFileSizePad,
+         self.RawFileSize,
+         self.RawFileSizePad,
+         self.ComMethod) = unpack_dword_columns(buffer, offset, count, 8)
+
+    def __len__(self) -> int:
+        return len(self.NameOffset)
+
+# Define the folder entry table, stored column-wise (one array per field)
+class TArchFolderTable:
     __slots__ = ('NameOffset', 'Unk1', 'Unk2', 'FileCount')
-    
-    def __init__(self, data: bytes):
-        if len(data) != 16:  # 4 DWORDs * 4 bytes
-            raise ValueError("Invalid TArchFolderEntry size. Expected 16 bytes.")
-        unpacked = FOLDER_ENTRY_STRUCT.unpack(data)
-        self.NameOffset = unpacked[0]
-        self.Unk1 = unpacked[1]
-        self.Unk2 = unpacked[2]
-        self.FileCount = unpacked[3]
 
+    def __init__(self, buffer, offset: int, count: int):
+        if len(buffer) - offset < 16 * count:  # 4 DWORDs * 4 bytes per entry
+            raise ValueError(f"Invalid TArchFolderEntry table size. Expected {16 * count} bytes.")
+        (self.NameOffset,
+         self.Unk1,
+         self.Unk2,
+         self.FileCount) = unpack_dword_columns(buffer, offset, count, 4)
+
+    def __len__(self) -> int:
+        return len(self.NameOffset)
+
+@functools.lru_cache(maxsize=65536)
 def sanitize_filename(name: str) -> str:
     """
     Removes or replaces invalid characters in file and folder names.
     """
-    valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-    sanitized = ''.join(c if c in valid_chars else '_' for c in name)
-    print(f"Sanitized '{name}' to '{sanitized}'")
+    sanitized = name.translate(FILENAME_TRANSLATION)
+    log.debug("Sanitized '%s' to '%s'", name, sanitized)
     return sanitized
 
+@functools.lru_cache(maxsize=65536)
 def normalize_path(name: str) -> Path:
     """
     Splits the name on backslashes and forward slashes,
     sanitizes each part, and rejoins them using pathlib.
+    Results are cached, since archives repeat the same folder prefixes.
     """
-    parts = re.split(r'[\\/]', name)
+    parts = name.replace('\\', '/').split('/')
     sanitized_parts = [sanitize_filename(part) for part in parts if part]
     normalized = Path(*sanitized_parts) if sanitized_parts else Path()
-    print(f"Normalized path: '{name}' to '{normalized}'")
+    log.debug("Normalized path: '%s' to '%s'", name, normalized)
     return normalized
 
-def decompress_zlib_blocks(in_file, out_file, compressed_size: int) -> bool:
+def ensure_directory(path: Path, created_dirs: Set[Path]) -> None:
     """
-    Decompresses data using FEAR2's block-based compression format.
+    Creates path (and its parents) unless it was already created during this extraction.
     """
-    try:
-        total_read = 0
-        decompressor = zlib.decompressobj(-15)  # Raw deflate format
-        
-        while total_read < compressed_size:
-            # Read block header
-            header = in_file.read(8)
-            if len(header) < 8:
-                print("Error: Incomplete block header")
-                return False
+    if path not in created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        created_dirs.add(path)
 
-            compressed_size_block, decompressed_size = BLOCK_HEADER_STRUCT.unpack(header)
-            total_read += 8
+def _inflate_block(block: Tuple[bytes, int], emit: Callable[[str], None] = print) -> bytes:
+    """
+    Inflates a single block. Stored (uncompressed) blocks are returned unchanged.
+    """
+    compressed_data, decompressed_size = block
+    if len(compressed_data) == decompressed_size:
+        return compressed_data
+    # Each block is a self-contained raw deflate stream of known size
+    decompressed = zlib.decompress(compressed_data, -15, decompressed_size)
+    if len(decompressed) != decompressed_size:
+        emit(f"Warning: Decompressed size mismatch: expected {decompressed_size}, got {len(decompressed)}")
+    return decompressed
+
+def scan_zlib_blocks(archive_view, offset: int, compressed_size: int,
+                     emit: Callable[[str], None] = print) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Walks the block headers of a compressed file and returns a
+    (data_offset, compressed_size, decompressed_size) tuple per block,
+    or None if the blocks run past the end of the archive.
+    """
+    end = offset + compressed_size
+    archive_size = len(archive_view)
+    blocks = []
 
-            # Read the compressed data block
-            compressed_data = in_file.read(compressed_size_block)
-            if len(compressed_data) < compressed_size_block:
-                print("Error: Incomplete compressed data block")
-                return False
-            total_read += compressed_size_block
+    while offset < end:
+        # Read block header
+        if offset + 8 > archive_size:
+            emit("Error: Incomplete block header")
+            return None
 
-            # Handle padding
-            padding = (4 - (compressed_size_block % 4)) % 4
-            if padding:
-                in_file.read(padding)
-                total_read += padding
+        compressed_size_block, decompressed_size = BLOCK_HEADER_STRUCT.unpack_from(archive_view, offset)
+        offset += 8
 
-            # Check if this is an uncompressed block
-            if compressed_size_block == decompressed_size:
-                out_file.write(compressed_data)
-            else:
-                try:
-                    # Try decompression with reusable decompressor object
-                    decompressed = decompressor.decompress(compressed_data)
-                    if len(decompressed) != decompressed_size:
-                        print(f"Warning: Decompressed size mismatch: expected {decompressed_size}, got {len(decompressed)}")
-                    out_file.write(decompressed)
-                except zlib.error as e:
-                    print(f"Error: Failed to decompress block: {e}")
-                    return False
+        # Check the compressed data block
+        if offset + compressed_size_block > archive_size:
+            emit("Error: Incomplete compressed data block")
+            return None
+        blocks.append((offset, compressed_size_block, decompressed_size))
 
-        return True
+        # Skip the block and its padding to the next DWORD boundary
+        offset += compressed_size_block + (4 - (compressed_size_block % 4)) % 4
+
+    return blocks
+
+def inflate_blocks(block_data, executor: Optional[Executor] = None,
+                   emit: Callable[[str], None] = print):
+    """
+    Yields the inflated blocks in order. With an executor, up to INFLATE_WINDOW
+    blocks are inflated ahead on its worker threads; zlib releases the GIL while
+    inflating, so they decompress in parallel. Raises zlib.error on a bad block.
+    """
+    if executor is None:
+        for block in block_data:
+            yield _inflate_block(block, emit)
+        return
+    window = deque()
+    try:
+        for block in block_data:
+            window.append(executor.submit(_inflate_block, block, emit))
+            if len(window) >= INFLATE_WINDOW:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+    finally:
+        # Blocks queued for a file that is abandoned are not inflated
+        for future in window:
+            future.cancel()
+
+def decompress_zlib_blocks(archive_view, offset: int, compressed_size: int,
+                           executor: Optional[Executor] = None,
+                           emit: Callable[[str], None] = print):
+    """
+    Decompresses data using FEAR2's block-based compression format.
+    Returns an iterator over the inflated blocks in order (see inflate_blocks),
+    or None if the block headers are broken.
+    Blocks are sliced straight out of the mapped archive without copying.
+    """
+    try:
+        blocks = scan_zlib_blocks(archive_view, offset, compressed_size, emit)
+        if blocks is None:
+            return None
+
+        block_data = [(archive_view[data_offset:data_offset + block_size], decompressed_size)
+                      for data_offset, block_size, decompressed_size in blocks]
+        return inflate_blocks(block_data, executor, emit)
     except Exception as e:
-        print(f"Error: Decompression error: {e}")
-        return False
+        emit(f"Error: Decompression error: {e}")
+        return None
 
-def get_string_from_table(name_table: bytes, offset: int) -> Path:
+def advise_sequential_read(infile) -> None:
+    """
+    Tells the kernel the file will be read front to back so it can widen readahead.
+    No-op on platforms without posix_fadvise (e.g. Windows).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(infile.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError as e:
+        log.debug("posix_fadvise failed for '%s': %s", infile.name, e)
+
+def index_name_table(name_table: bytes) -> Dict[int, str]:
+    """
+    Decodes every null-terminated string in the name table once, keyed by its starting offset.
+    """
+    name_index = {}
+    offset = 0
+    for raw_name in name_table.split(b'\x00'):
+        name_index[offset] = raw_name.decode('utf-8', errors='ignore')
+        offset += len(raw_name) + 1
+    return name_index
+
+def get_string_from_table(name_table: bytes, offset: int,
+                          name_index: Optional[Dict[int, str]] = None,
+                          emit: Callable[[str], None] = print) -> Path:
     """
     Extracts a null-terminated string from the name table at the given offset.
+    Names found in name_index (see index_name_table) are not decoded again.
     """
     if offset >= len(name_table):
-        print(f"Warning: Offset {offset} out of range for name table.")
+        emit(f"Warning: Offset {offset} out of range for name table.")
         return Path("unknown")
-    end = name_table.find(b'\x00', offset)
-    if end == -1:
-        end = len(name_table)
-    try:
-        name = name_table[offset:end].decode('utf-8', errors='ignore')
-    except UnicodeDecodeError:
-        name = "unknown"
-    path = normalize_path(name)
-    return path
-
-def archive_extract(file_name: Path, target_folder: Path) -> bool:
-    """Extract contents of an archive file."""
+    name = name_index.get(offset) if name_index is not None else None
+    if name is None:
+        end = name_table.find(b'\x00', offset)
+        if end == -1:
+            end = len(name_table)
+        try:
+            name = name_table[offset:end].decode('utf-8', errors='ignore')
+        except UnicodeDecodeError:
+            name = "unknown"
+    return normalize_path(name)
+
+class FileWriter:
+    """
+    Writes extracted files on a background thread so that opening and
+    writing output files overlaps with decompressing the next entries.
+    Files are queued chunk by chunk, and at most max_pending_bytes of them
+    wait at once. Queued data may be slices of the mapped archive, so
+    close() must be called before the mapping is released.
+    """
+
+    def __init__(self, max_pending_bytes: int = WRITE_QUEUE_BYTES,
+                 emit: Callable[[str], None] = print):
+        self.failed = False
+        self.emit = emit
+        self._queue = queue.Queue()
+        self._max_pending_bytes = max_pending_bytes
+        self._pending_bytes = 0
+        self._room = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="arch-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, chunks) -> bool:
+        """
+        Queues the chunks to be written to path, in order. chunks may be any iterable;
+        it is consumed here, blocking while the writer is too far behind.
+        If iterating it raises, the partly written file is removed and the error re-raised.
+        Returns False once an earlier write has failed.
+        """
+        if self.failed:
+            return False
+        self._put('open', path, 0)
+        try:
+            for chunk in chunks:
+                self._put('data', chunk, len(chunk))
+                del chunk
+        except BaseException:
+            self._put('abort', None, 0)
+            raise
+        self._put('close', None, 0)
+        return not self.failed
+
+    def close(self) -> bool:
+        """Waits for all queued files to be written and reports whether every write succeeded."""
+        self._queue.put(None)
+        self._thread.join()
+        return not self.failed
+
+    def _put(self, kind: str, payload, size: int) -> None:
+        with self._room:
+            # A chunk larger than the whole budget still goes through once the queue is empty
+            while self._pending_bytes and self._pending_bytes + size > self._max_pending_bytes:
+                self._room.wait()
+            self._pending_bytes += size
+        self._queue.put((kind, payload, size))
+
+    def _run(self) -> None:
+        outfile = None
+        path = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, payload, size = item
+            del item
+            try:
+                if self.failed:
+                    pass  # Drain the queue without writing anything more
+                elif kind == 'open':
+                    path = payload
+                    outfile = open(path, 'wb', buffering=IO_BUFFER_SIZE)
+                elif kind == 'data':
+                    outfile.write(payload)
+                elif kind == 'close':
+                    outfile.close()
+                    outfile = None
+                else:  # 'abort': the data for this file could not be produced
+                    outfile.close()
+                    outfile = None
+                    os.remove(path)
+            except Exception as e:
+                self.emit(f"Error writing file '{path}': {e}")
+                self.failed = True
+                if outfile is not None:
+                    try:
+                        outfile.close()
+                    except OSError:
+                        pass
+                    outfile = None
+            finally:
+                del payload
+                with self._room:
+                    self._pending_bytes -= size
+                    self._room.notify()
+
+def archive_extract(file_name: Path, target_folder: Path, emit: Callable[[str], None] = print) -> bool:
+    """
+    Extract contents of an archive file.
+    Messages go to emit, one line per call; batch jobs collect them to print together.
+    """
     try:
         with open(file_name, 'rb') as infile:
-            # Read and parse header
-            header_data = infile.read(48)  # 12 DWORDs * 4 bytes
-            if len(header_data) < 48:
-                print("Error: Incomplete header.")
-                return False
-            arch_header = TArchFileHeader(header_data)
-            print(f"Header - Marker: {arch_header.Marker}, Version: {arch_header.Version}, "
-                  f"NameTableSize: {arch_header.NameTableSize}, "
-                  f"FolderCount: {arch_header.FolderCount}, FileCount: {arch_header.FileCount}")
-
-            # Read name table
-            name_table = infile.read(arch_header.NameTableSize)
-            if len(name_table) < arch_header.NameTableSize:
-                print("Error: Incomplete name table.")
-                return False
-            print(f"Read name table of size {arch_header.NameTableSize} bytes.")
+            advise_sequential_read(infile)
 
-            # Read file entries
-            arch_file_table = []
-            file_entries_data = infile.read(32 * arch_header.FileCount)
-            if len(file_entries_data) < 32 * arch_header.FileCount:
-                print("Error: Incomplete file entries.")
+            if os.fstat(infile.fileno()).st_size < 48:
+                emit("Error: Incomplete header.")
                 return False
-            for i in range(arch_header.FileCount):
-                entry_data = file_entries_data[i*32:(i+1)*32]
-                arch_file_table.append(TArchFileEntry(entry_data))
-            print(f"Read {len(arch_file_table)} file entries.")
-
-            # Read folder entries
-            arch_folder_table = []
-            folder_entries_data = infile.read(16 * arch_header.FolderCount)
-            if len(folder_entries_data) < 16 * arch_header.FolderCount:
-                print("Error: Incomplete folder entries.")
-                return False
-            for i in range(arch_header.FolderCount):
-                folder_data = folder_entries_data[i*16:(i+1)*16]
-                arch_folder_table.append(TArchFolderEntry(folder_data))
-            print(f"Read {len(arch_folder_table)} folder entries.")
 
-            # Process folders and files
-            return _process_folders_and_files(infile, arch_folder_table, arch_file_table, name_table, target_folder)
+            # Map the whole archive; tables and file data are sliced out of it directly
+            with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as archive_map:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    archive_map.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(archive_map) as archive_view:
+                    return _extract_mapped_archive(archive_view, target_folder, emit)
 
     except Exception as e:
-        print(f"Error extracting '{file_name}': {e}")
+        emit(f"Error extracting '{file_name}': {e}")
+        return False
+
+def _extract_mapped_archive(archive_view, target_folder: Path, emit: Callable[[str], None] = print) -> bool:
+    """Parse the tables of a mapped archive and extract its contents."""
+    # Parse header
+    arch_header = TArchFileHeader.from_buffer(archive_view, 0)  # 12 DWORDs * 4 bytes
+    emit(f"Header - Marker: {arch_header.Marker}, Version: {arch_header.Version}, "
+          f"NameTableSize: {arch_header.NameTableSize}, "
+          f"FolderCount: {arch_header.FolderCount}, FileCount: {arch_header.FileCount}")
+
+    # The tables follow the header back to back
+    name_table_offset = 48
+    file_table_offset = name_table_offset + arch_header.NameTableSize
+    folder_table_offset = file_table_offset + 32 * arch_header.FileCount
+    tables_end = folder_table_offset + 16 * arch_header.FolderCount
+    archive_size = len(archive_view)
+
+    # Read name table
+    if file_table_offset > archive_size:
+        emit("Error: Incomplete name table.")
+        return False
+    name_table = archive_view[name_table_offset:file_table_offset].tobytes()
+    name_index = index_name_table(name_table)
+    emit(f"Read name table of size {arch_header.NameTableSize} bytes.")
+
+    # Read file entries
+    if folder_table_offset > archive_size:
+        emit("Error: Incomplete file entries.")
+        return False
+    arch_file_table = TArchFileTable(archive_view, file_table_offset, arch_header.FileCount)
+    emit(f"Read {len(arch_file_table)} file entries.")
+
+    # Read folder entries
+    if tables_end > archive_size:
+        emit("Error: Incomplete folder entries.")
         return False
+    arch_folder_table = TArchFolderTable(archive_view, folder_table_offset, arch_header.FolderCount)
+    emit(f"Read {len(arch_folder_table)} folder entries.")
 
-def _process_folders_and_files(infile, arch_folder_table, arch_file_table, name_table, target_folder) -> bool:
+    # Process folders and files, inflating blocks on a small thread pool
+    # and writing the results out on a separate writer thread
+    writer = FileWriter(emit=emit)
+    try:
+        with ThreadPoolExecutor(max_workers=DECOMPRESS_WORKERS) as executor:
+            success = _process_folders_and_files(archive_view, arch_folder_table, arch_file_table,
+                                                 name_table, name_index, target_folder,
+                                                 writer, executor, emit)
+    finally:
+        written = writer.close()
+    return success and written
+
+def _process_folders_and_files(archive_view, arch_folder_table, arch_file_table, name_table,
+                               name_index, target_folder, writer: FileWriter,
+                               executor: Optional[Executor] = None,
+                               emit: Callable[[str], None] = print) -> bool:
     """Process folders and files from the archive."""
     try:
-        file_entry_index = 0
-        for folder_index, folder in enumerate(arch_folder_table):
-            if folder.FileCount == 0:
-                print(f"Folder {folder_index} has no files. Skipping.")
+        created_dirs = set()
+        file_folders = []  # Output folder of each file entry, in table order
+        for folder_index, folder_file_count in enumerate(arch_folder_table.FileCount):
+            if folder_file_count == 0:
+                log.debug("Folder %d has no files. Skipping.", folder_index)
                 continue
 
-            folder_name = get_string_from_table(name_table, folder.NameOffset)
+            folder_name = get_string_from_table(name_table, arch_folder_table.NameOffset[folder_index],
+                                                name_index, emit)
             if not folder_name:
                 folder_name = Path("unknown_folder")
             out_folder_path = target_folder / folder_name
-            print(f"Creating directory: '{out_folder_path}'")
-            out_folder_path.mkdir(parents=True, exist_ok=True)
-
-            # Process files in folder
-            for _ in range(folder.FileCount):
-                if file_entry_index >= len(arch_file_table):
-                    print("Error: File entry index out of range.")
-                    return False
+            log.debug("Creating directory: '%s'", out_folder_path)
+            ensure_directory(out_folder_path, created_dirs)
 
-                if not _process_single_file(infile, arch_file_table[file_entry_index], 
-                                         name_table, out_folder_path):
-                    return False
-                file_entry_index += 1
+            # Files are stored folder by folder in the file table
+            if len(file_folders) + folder_file_count > len(arch_file_table):
+                emit("Error: File entry index out of range.")
+                return False
+            file_folders.extend([out_folder_path] * folder_file_count)
+
+        # Visit files in data order so the archive is read front to back
+        read_order = sorted(range(len(file_folders)), key=arch_file_table.FileOffset.__getitem__)
+        for file_entry_index in read_order:
+            if not _process_single_file(archive_view, arch_file_table, file_entry_index,
+                                        name_table, name_index, file_folders[file_entry_index],
+                                        created_dirs, writer, executor, emit):
+                return False
 
         return True
     except Exception as e:
-        print(f"Error processing folders and files: {e}")
+        emit(f"Error processing folders and files: {e}")
         return False
 
-def _process_single_file(infile, file_entry, name_table, out_folder_path) -> bool:
+def _process_single_file(archive_view, file_table, index, name_table, name_index, out_folder_path,
+                         created_dirs: Set[Path], writer: FileWriter,
+                         executor: Optional[Executor] = None,
+                         emit: Callable[[str], None] = print) -> bool:
     """Process a single file from the archive."""
     try:
-        file_name = get_string_from_table(name_table, file_entry.NameOffset)
+        file_name = get_string_from_table(name_table, file_table.NameOffset[index], name_index, emit)
         if not file_name:
             file_name = Path("unknown")
 
         out_file_path = out_folder_path / file_name
-        print(f"Writing file: '{out_file_path}'")
-
-        infile.seek(file_entry.FileOffset)
-        out_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(out_file_path, 'wb') as outfile:
-            if file_entry.ComMethod == COM_METHOD_RAW:
-                raw_size = file_entry.RawFileSize
-                outfile.write(infile.read(raw_size))
-                print(f"Extracted raw file: '{out_file_path}'")
-                return True
-            elif file_entry.ComMethod == COM_METHOD_ZLIB:
-                success = decompress_zlib_blocks(infile, outfile, file_entry.ComFileSize)
-                if success:
-                    print(f"Extracted and decompressed file: '{out_file_path}'")
-                else:
-                    print(f"Failed to decompress '{out_file_path}'")
-                return success
-            else:
-                print(f"Unsupported compression method {file_entry.ComMethod} for file '{file_name}'")
+        log.debug("Writing file: '%s'", out_file_path)
+
+        file_offset = file_table.FileOffset[index]
+        ensure_directory(out_file_path.parent, created_dirs)
+
+        com_method = file_table.ComMethod[index]
+        if com_method == COM_METHOD_RAW:
+            raw_size = file_table.RawFileSize[index]
+            log.debug("Extracted raw file: '%s'", out_file_path)
+            return writer.write(out_file_path, (archive_view[file_offset:file_offset + raw_size],))
+        elif com_method == COM_METHOD_ZLIB:
+            chunks = decompress_zlib_blocks(archive_view, file_offset,
+                                            file_table.ComFileSize[index], executor, emit)
+            if chunks is None:
+                emit(f"Failed to decompress '{out_file_path}'")
                 return False
+            try:
+                # Blocks are inflated as the writer takes them; a bad block removes the partial file
+                written = writer.write(out_file_path, chunks)
+            except zlib.error as e:
+                emit(f"Error: Failed to decompress block: {e}")
+                emit(f"Failed to decompress '{out_file_path}'")
+                return False
+            log.debug("Extracted and decompressed file: '%s'", out_file_path)
+            return written
+        else:
+            emit(f"Unsupported compression method {com_method} for file '{file_name}'")
+            return False
 
     except Exception as e:
-        print(f"Error processing file: {e}")
+        emit(f"Error processing file: {e}")
         return False
 
+def _extract_archive_job(job: Tuple[Path, Path]) -> Tuple[Path, bool, List[str]]:
+    """
+    Batch worker: extracts one archive and reports whether it succeeded,
+    along with the messages it printed, to be shown together.
+    """
+    source_file, target_subfolder = job
+    messages = []
+    return source_file, archive_extract(source_file, target_subfolder, messages.append), messages
+
 def archive_batch_extract(source_folder: Path, target_folder: Path, delete_source: bool=False):
     """
     Performs batch extraction of all .arch01 files in the source folder.
+    Archives are independent, so several are extracted at once on worker threads;
+    zlib and the file writes release the GIL. Threads rather than processes keep
+    every message on this process's stdout (the GUI log) and never fork the GUI.
+    Each archive's messages are printed as one block, in source order, once it is done.
     """
+    jobs = []
     for root, dirs, files in os.walk(source_folder):
         root_path = Path(root)
         for file in files:
@@ -279,19 +560,26 @@ def archive_batch_extract(source_folder: Path, target_folder: Path, delete_sourc
                 relative_path = source_file.parent.relative_to(source_folder)
                 target_subfolder = target_folder / relative_path
                 target_subfolder.mkdir(parents=True, exist_ok=True)
+                jobs.append((source_file, target_subfolder))
 
-                print(f'Extracting: {source_file}')
-                success = archive_extract(source_file, target_subfolder)
-                if success:
-                    print(f'Extraction successful: {source_file}')
-                    if delete_source:
-                        try:
-                            source_file.unlink()
-                            print(f'Deleted source file: {source_file}')
-                        except Exception as del_e:
-                            print(f"Failed to delete '{source_file}': {del_e}")
-                else:
-                    print(f'Extraction failed: {source_file}')
+    if not jobs:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), BATCH_WORKERS)) as executor:
+        for source_file, success, messages in executor.map(_extract_archive_job, jobs):
+            print(f'Extracting: {source_file}')
+            for message in messages:
+                print(message)
+            if success:
+                print(f'Extraction successful: {source_file}')
+                if delete_source:
+                    try:
+                        source_file.unlink()
+                        print(f'Deleted source file: {source_file}')
+                    except Exception as del_e:
+                        print(f"Failed to delete '{source_file}': {del_e}")
+            else:
+                print(f'Extraction failed: {source_file}')
 
 
 def main():
@@ -3,7 +3,8 @@ import sys
 import struct
 import argparse
 from pathlib import Path
-from typing import Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple, Dict, NamedTuple, Callable
 
 # Constants
 BNDL_MARKER = b'BNDL'  # equivalent to the Delphi version's marker
@@ -13,60 +14,111 @@ BNDL_MARKER_INT = struct.unpack('<I', BNDL_MARKER)[0]
 HEADER_STRUCT = struct.Struct('<IIIIII')  # 6 DWORDs
 SIZE_STRUCT = struct.Struct('<II')  # 2 DWORDs for file sizes
 
+# Chunk size for copying file data when os.sendfile is unavailable
+COPY_CHUNK_SIZE = 1024 * 1024
 
-class BundleHeader:
-    __slots__ = ('Marker', 'Version', 'TableSize', 'Unk1', 'Unk2', 'FileCount')
-    
-    def __init__(self, data: bytes):
-        if len(data) != 24:  # 6 DWORDs * 4 bytes
+# Bundles extracted at once in batch mode; the copies are disk-bound and release the GIL
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class BundleHeader(NamedTuple):
+    Marker: int
+    Version: int
+    TableSize: int
+    Unk1: int
+    Unk2: int
+    FileCount: int
+
+    @classmethod
+    def from_buffer(cls, buffer, offset: int = 0) -> 'BundleHeader':
+        if len(buffer) - offset < 24:  # 6 DWORDs * 4 bytes
             raise ValueError("Invalid BundleHeader size. Expected 24 bytes.")
-        unpacked = HEADER_STRUCT.unpack(data)
-        self.Marker = unpacked[0]
-        self.Version = unpacked[1]
-        self.TableSize = unpacked[2]
-        self.Unk1 = unpacked[3]
-        self.Unk2 = unpacked[4]
-        self.FileCount = unpacked[5]
+        return cls._make(HEADER_STRUCT.unpack_from(buffer, offset))
+
+
+def index_name_table(table_buffer: bytes) -> Dict[int, str]:
+    """Decode every null-terminated string in the name table once, keyed by its starting offset."""
+    name_index = {}
+    pos = 0
+    for raw_name in table_buffer.split(b'\x00'):
+        name_index[pos] = raw_name.decode('utf-8', errors='ignore')
+        pos += len(raw_name) + 1
+    return name_index
 
 
-def read_null_terminated_string(table_buffer: bytes, pos: int) -> Tuple[str, int]:
+def read_null_terminated_string(table_buffer: bytes, pos: int,
+                                name_index: Optional[Dict[int, str]] = None) -> Tuple[str, int]:
     """Read a null-terminated string from the buffer and return the string and new position."""
     end = table_buffer.find(b'\x00', pos)
     if end == -1:
         end = len(table_buffer)
-    name = table_buffer[pos:end].decode('utf-8', errors='ignore')
-    name_size = len(name) + 1  # Include null terminator
+    name = name_index.get(pos) if name_index is not None else None
+    if name is None:
+        name = table_buffer[pos:end].decode('utf-8', errors='ignore')
+    # Entries are padded by their encoded size, not the length of the decoded name
+    name_size = end - pos + 1  # Include null terminator
     padding = (4 - (name_size % 4)) % 4
-    new_pos = pos + name_size + padding
+    new_pos = end + 1 + padding
     return name, new_pos
 
 
-def extract_bundle_file(file_name: Path, target_folder: Path) -> bool:
-    """Extract contents of a bundle file."""
+def copy_file_data(infile, outfile, size: int) -> int:
+    """Copy size bytes from the current position of infile to outfile and return the count copied.
+
+    Uses os.sendfile so the data is copied inside the kernel; falls back to a chunked
+    read/write loop where sendfile is missing or cannot target regular files.
+    """
+    offset = infile.tell()
+    copied = 0
+    if hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset + copied, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            pass  # e.g. macOS only allows sockets as the destination
+    infile.seek(offset + copied)
+
+    while copied < size:
+        chunk = infile.read(min(size - copied, COPY_CHUNK_SIZE))
+        if not chunk:
+            break
+        outfile.write(chunk)
+        copied += len(chunk)
+    return copied
+
+
+def extract_bundle_file(file_name: Path, target_folder: Path, emit: Callable[[str], None] = print) -> bool:
+    """Extract contents of a bundle file, sending each message line to emit."""
     try:
         with open(file_name, 'rb') as infile:
+            bundle_size = os.fstat(infile.fileno()).st_size
+
             # Read and validate header
             header_data = infile.read(24)
             if len(header_data) < 24:
-                print("Error: Incomplete header.")
+                emit("Error: Incomplete header.")
                 return False
 
-            header = BundleHeader(header_data)
+            header = BundleHeader.from_buffer(header_data, 0)
 
             # Verify BNDL marker
             if header.Marker != BNDL_MARKER_INT:
-                print("Error: Invalid BNDL marker")
+                emit("Error: Invalid BNDL marker")
                 return False
 
             if header.TableSize == 0 or header.FileCount == 0:
-                print("Warning: Empty bundle file")
+                emit("Warning: Empty bundle file")
                 return True
 
             # Read name table
             table_buffer = infile.read(header.TableSize)
             if len(table_buffer) < header.TableSize:
-                print("Error: Incomplete name table")
+                emit("Error: Incomplete name table")
                 return False
+            name_index = index_name_table(table_buffer)
 
             # Handle Unk2 offset adjustment
             if header.Unk2 != 0:
@@ -74,44 +126,59 @@ def extract_bundle_file(file_name: Path, target_folder: Path) -> bool:
                 infile.seek(data_offset + (header.Unk2 * 4))
 
             # Process each file
+            created_dirs = set()
             table_pos = 0
             for file_index in range(header.FileCount):
                 # Read file sizes
                 sizes_data = infile.read(8)
                 if len(sizes_data) < 8:
-                    print(f"Error: Incomplete size data for file {file_index}")
+                    emit(f"Error: Incomplete size data for file {file_index}")
                     return False
 
                 in_size1, in_size2 = SIZE_STRUCT.unpack(sizes_data)
                 in_size = in_size2  # Using the second size value as per original code
 
-                # Read file data
-                file_data = infile.read(in_size)
-                if len(file_data) < in_size:
-                    print(f"Error: Incomplete file data for file {file_index}")
+                if infile.tell() + in_size > bundle_size:
+                    emit(f"Error: Incomplete file data for file {file_index}")
                     return False
 
                 # Get filename from table
-                out_name, table_pos = read_null_terminated_string(table_buffer, table_pos)
+                out_name, table_pos = read_null_terminated_string(table_buffer, table_pos, name_index)
 
                 # Create output file
                 out_path = Path(target_folder) / out_name
-                out_path.parent.mkdir(parents=True, exist_ok=True)
+                if out_path.parent not in created_dirs:
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(out_path.parent)
 
-                print(f"Extracting: {out_path}")
+                emit(f"Extracting: {out_path}")
                 with open(out_path, 'wb') as outfile:
-                    outfile.write(file_data)
+                    if copy_file_data(infile, outfile, in_size) < in_size:
+                        emit(f"Error: Incomplete file data for file {file_index}")
+                        return False
 
         return True
     except Exception as e:
-        print(f"Error extracting '{file_name}': {e}")
+        emit(f"Error extracting '{file_name}': {e}")
         return False
 
 
+def _extract_bundle_job(job: Tuple[Path, Path]) -> Tuple[Path, bool, List[str]]:
+    """Batch worker: extract one bundle and report whether it succeeded, with the messages it printed."""
+    source_file, target_subfolder = job
+    messages = []
+    return source_file, extract_bundle_file(source_file, target_subfolder, messages.append), messages
+
+
 def batch_extract_bndl(source_folder: Path, target_folder: Path, delete_source: bool = False) -> bool:
-    """Batch extract all BNDL files in a folder."""
+    """
+    Batch extract all BNDL files in a folder, several bundles at once on worker threads.
+    Threads rather than processes keep every message on this process's stdout (the GUI log).
+    Each bundle's messages are printed as one block, in source order, once it is done.
+    """
     try:
         success = True
+        jobs = []
         for root, _, files in os.walk(source_folder):
             root_path = Path(root)
             for file in files:
@@ -121,9 +188,17 @@ def batch_extract_bndl(source_folder: Path, target_folder: Path, delete_source:
                 source_file = root_path / file
                 relative_path = source_file.parent.relative_to(source_folder)
                 target_subfolder = target_folder / relative_path
+                jobs.append((source_file, target_subfolder))
+
+        if not jobs:
+            return success
 
+        with ThreadPoolExecutor(max_workers=min(len(jobs), BATCH_WORKERS)) as executor:
+            for source_file, extracted, messages in executor.map(_extract_bundle_job, jobs):
                 print(f'Extracting: {source_file}')
-                if extract_bundle_file(source_file, target_subfolder):
+                for message in messages:
+                    print(message)
+                if extracted:
                     print(f'Extraction successful: {source_file}')
                     if delete_source:
                         try:
@@ -1,7 +1,11 @@
 import os
+import mmap
+import logging
 import struct
+import threading
 from pathlib import Path
 from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants for WAV format - pre-compile markers and structs
 RIFF_MARKER = struct.unpack('<I', b'RIFF')[0]
@@ -13,21 +17,29 @@ DATA_MARKER = struct.unpack('<I', b'data')[0]
 HEADER_STRUCT = struct.Struct('<6I')  # First 24 bytes (6 DWORDs)
 UNK_TABLE_STRUCT = struct.Struct('<65I')  # UnkTable with 65 elements
 CHUNK_HEADER_STRUCT = struct.Struct('<6I2H2I2H')  # 40 bytes total
-RIFF_HEADER_STRUCT = struct.Struct('<4I')  # RIFF header (4 DWORDs)
-FMT_CHUNK_STRUCT = struct.Struct('<2H2I2H')  # fmt chunk (16 bytes)
-DATA_HEADER_STRUCT = struct.Struct('<2I')  # data chunk header (2 DWORDs)
+# RIFF header (4 DWORDs) + fmt chunk size + fmt chunk (16 bytes) + data chunk header (2 DWORDs)
+WAV_HEADER_STRUCT = struct.Struct('<4I I 2H2I2H 2I')  # 44 bytes total
+FMT_CHUNK_SIZE = 16
+
+log = logging.getLogger(__name__)
+
+# Threads writing extracted WAV files concurrently
+WRITE_WORKERS = 8
+
+# One reusable WAV header buffer per writer thread
+_header_buffers = threading.local()
 
 
 class SNDHeader:
     __slots__ = ('Version', 'FileCount', 'ChunkEntryOffset', 'ChunkInfoOffset',
                  'ChunkBaseOffset', 'UnkCount', 'UnkTable')
     
-    def __init__(self, data: bytes):
-        if len(data) != 284:  # 24 bytes header + 260 bytes UnkTable
-            raise ValueError(f"Invalid SNDHeader size. Got {len(data)} bytes, expected 284 bytes")
+    def __init__(self, data, offset: int = 0):
+        if len(data) - offset < 284:  # 24 bytes header + 260 bytes UnkTable
+            raise ValueError(f"Invalid SNDHeader size. Got {len(data) - offset} bytes, expected 284 bytes")
 
         # First 24 bytes (6 DWORDs)
-        header_values = HEADER_STRUCT.unpack(data[:24])
+        header_values = HEADER_STRUCT.unpack_from(data, offset)
         (self.Version,  # Always 2
          self.FileCount,
          self.ChunkEntryOffset,  # First TSNDChunkEntry, Size of Table = FileCount * 8
@@ -36,61 +48,89 @@ class SNDHeader:
          self.UnkCount) = header_values
 
         # UnkTable with 65 elements (Array[0..64])
-        self.UnkTable = list(UNK_TABLE_STRUCT.unpack(data[24:284]))
+        # kept as the unpacked tuple; nothing here modifies it
+        self.UnkTable = UNK_TABLE_STRUCT.unpack_from(data, offset + 24)
 
 
-class SNDChunkHeader:
-    __slots__ = ('TotalSize', 'SoundType', 'SNDChunkSize', 'WAVEHeaderSize',
-                 'DataOffset', 'DataSize', 'ComCode', 'ChannelCount',
-                 'SampleRate', 'StreamRate', 'BlockAlign', 'SampleSize')
-    
-    def __init__(self, data: bytes):
-        if len(data) != 40:  # 40 bytes
-            raise ValueError(f"Invalid SNDChunkHeader size. Got {len(data)} bytes, expected 40 bytes")
-
-        # Unpack exactly as per the original structure (40 bytes total)
-        values = CHUNK_HEADER_STRUCT.unpack(data)
-        (self.TotalSize,  # DWORD
-         self.SoundType,  # DWORD
-         self.SNDChunkSize,  # DWORD (always 16)
-         self.WAVEHeaderSize,  # DWORD (always 40)
-         self.DataOffset,  # DWORD (always 56)
-         self.DataSize,  # DWORD
-         self.ComCode,  # WORD
-         self.ChannelCount,  # WORD
-         self.SampleRate,  # DWORD
-         self.StreamRate,  # DWORD
-         self.BlockAlign,  # WORD
-         self.SampleSize  # WORD
-         ) = values
-
-
-def write_wav_header(outfile, chunk_header: SNDChunkHeader, in_size: int) -> None:
-    """Write WAV header to the output file."""
-    # RIFF header
-    RIFF_HEADER_STRUCT.pack_into(outfile, 0,
+def write_wav_header(outfile, fmt_chunk: Tuple[int, ...], in_size: int,
+                     header_buf: Optional[bytearray] = None) -> None:
+    """Write WAV header to the output file, packing it into header_buf if one is given.
+
+    fmt_chunk is the (ComCode, ChannelCount, SampleRate, StreamRate, BlockAlign, SampleSize)
+    slice of a chunk header.
+    """
+    if header_buf is None:
+        header_buf = bytearray(WAV_HEADER_STRUCT.size)
+    WAV_HEADER_STRUCT.pack_into(header_buf, 0,
+        # RIFF header
         RIFF_MARKER,
         in_size + 36,  # Total size
         WAVE_MARKER,
-        FMT_MARKER
-    )
-
-    # fmt chunk
-    outfile.write(struct.pack('<I', 16))  # fmt chunk size
-    FMT_CHUNK_STRUCT.pack_into(outfile, outfile.tell(),
-        chunk_header.ComCode,
-        chunk_header.ChannelCount,
-        chunk_header.SampleRate,
-        chunk_header.StreamRate,
-        chunk_header.BlockAlign,
-        chunk_header.SampleSize
-    )
-
-    # data chunk
-    DATA_HEADER_STRUCT.pack_into(outfile, outfile.tell(),
+        FMT_MARKER,
+        # fmt chunk
+        FMT_CHUNK_SIZE,
+        *fmt_chunk,
+        # data chunk
         DATA_MARKER,
         in_size
     )
+    outfile.write(header_buf)
+
+
+def _thread_header_buffer() -> bytearray:
+    """Return the WAV header buffer owned by the calling thread."""
+    header_buf = getattr(_header_buffers, 'buf', None)
+    if header_buf is None:
+        header_buf = _header_buffers.buf = bytearray(WAV_HEADER_STRUCT.size)
+    return header_buf
+
+
+def fadvise(infile, advice_name: str) -> None:
+    """
+    Passes a posix_fadvise hint (e.g. 'POSIX_FADV_SEQUENTIAL') for the whole file.
+    No-op on platforms without posix_fadvise (e.g. Windows).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(infile.fileno(), 0, 0, getattr(os, advice_name))
+    except OSError as e:
+        log.debug("posix_fadvise failed for '%s': %s", infile.name, e)
+
+
+def preallocate(outfile, size: int) -> None:
+    """
+    Reserves size bytes for outfile up front so the filesystem can lay it out in one extent.
+    No-op where posix_fallocate is unavailable or unsupported by the filesystem.
+    """
+    if not hasattr(os, 'posix_fallocate') or size <= 0:
+        return
+    try:
+        os.posix_fallocate(outfile.fileno(), 0, size)
+    except OSError as e:
+        log.debug("posix_fallocate failed for '%s': %s", outfile.name, e)
+
+
+def copy_file_data(snd_view, infile, outfile, offset: int, size: int) -> None:
+    """Copy size bytes at offset in the SND file to outfile.
+
+    Uses os.sendfile so the data is copied inside the kernel; falls back to writing
+    straight from the mapped file where sendfile is missing or cannot target regular files.
+    """
+    copied = 0
+    outfile.flush()  # sendfile writes to the descriptor, behind any buffered header
+    if hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset + copied, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            pass  # e.g. macOS only allows sockets as the destination
+
+    if copied < size:
+        outfile.write(snd_view[offset + copied:offset + size])
 
 
 def convert_sound_to_wave(file_name: Path) -> bool:
@@ -107,27 +147,20 @@ def convert_sound_to_wave(file_name: Path) -> bool:
         print(f"Output directory: {output_dir}")
 
         with open(file_name, 'rb') as infile:
-            # Read SND header
-            header_data = infile.read(284)
-            if len(header_data) != 284:
-                print(f"Error: Invalid header size. Got {len(header_data)} bytes")
+            file_size = os.fstat(infile.fileno()).st_size
+            if file_size < 284:
+                print(f"Error: Invalid header size. Got {file_size} bytes")
                 return False
 
-            snd_header = SNDHeader(header_data)
-            print(f"SND Info:")
-            print(f"  Version: {snd_header.Version}")
-            print(f"  Number of files: {snd_header.FileCount}")
-            print(f"  Chunk base offset: {snd_header.ChunkBaseOffset}")
-
-            # Move to the chunk base offset where audio data starts
-            infile.seek(snd_header.ChunkBaseOffset)
-
-            # Process each sound file
-            for file_index in range(snd_header.FileCount):
-                if not _process_sound_file(infile, file_index, file_name, output_dir):
-                    return False
+            # Map the whole file; headers are unpacked straight out of the mapping
+            fadvise(infile, 'POSIX_FADV_SEQUENTIAL')
+            with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as snd_map:
+                with memoryview(snd_map) as snd_view:
+                    success = _convert_mapped_sounds(snd_view, infile, file_name, output_dir)
 
-        return True
+            # Every sound has been copied out; don't keep the archive in the page cache
+            fadvise(infile, 'POSIX_FADV_DONTNEED')
+            return success
 
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -136,46 +169,104 @@ def convert_sound_to_wave(file_name: Path) -> bool:
         return False
 
 
-def _process_sound_file(infile, file_index: int, source_file: Path, output_dir: Path) -> bool:
-    """Process a single sound file from the SND archive."""
+def _convert_mapped_sounds(snd_view, infile, file_name: Path, output_dir: Path) -> bool:
+    """Convert every sound in a mapped SND file.
+
+    The chunk headers are walked first, then the WAV files are written
+    concurrently so many output files are in flight at once.
+    """
+    snd_header = SNDHeader(snd_view, 0)
+    print(f"SND Info:")
+    print(f"  Version: {snd_header.Version}")
+    print(f"  Number of files: {snd_header.FileCount}")
+    print(f"  Chunk base offset: {snd_header.ChunkBaseOffset}")
+
+    # Audio data starts at the chunk base offset
+    offset = snd_header.ChunkBaseOffset
+
+    success = True
+    jobs = []
+    for file_index in range(snd_header.FileCount):
+        chunk = _read_sound_chunk(snd_view, offset, file_index, file_name, output_dir)
+        if chunk is None:
+            success = False
+            break  # still write the sounds that were read intact
+        offset, job = chunk
+        jobs.append(job)
+
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        for out_path, written in executor.map(lambda job: _write_sound_file(snd_view, infile, job), jobs):
+            if written:
+                log.debug("Created: %s", out_path)
+            else:
+                success = False
+
+    return success
+
+
+def _read_sound_chunk(snd_view, offset: int, file_index: int, source_file: Path,
+                      output_dir: Path) -> Optional[Tuple[int, tuple]]:
+    """Read the chunk header of a single sound file from the SND archive.
+
+    Returns the offset of the next chunk header and an
+    (out_path, fmt_chunk, data_offset, in_size) job, or None on failure.
+    """
+    # Read chunk header
+    if len(snd_view) - offset < 40:
+        print(f"Error: Invalid chunk header size for file {file_index}")
+        return None
+
+    # Unpack exactly as per the original TSNDChunkHeader structure (40 bytes total)
+    chunk_header = CHUNK_HEADER_STRUCT.unpack_from(snd_view, offset)
+    (total_size,  # DWORD
+     sound_type,  # DWORD
+     snd_chunk_size,  # DWORD (always 16)
+     wave_header_size,  # DWORD (always 40)
+     wave_data_offset,  # DWORD (always 56)
+     data_size,  # DWORD
+     com_code,  # WORD
+     channel_count,  # WORD
+     sample_rate,  # DWORD
+     stream_rate,  # DWORD
+     block_align,  # WORD
+     sample_size  # WORD
+     ) = chunk_header
+    offset += 40
+    log.debug("Processing file %d: Sample Rate: %d, Channels: %d, Bits Per Sample: %d",
+              file_index, sample_rate, channel_count, sample_size)
+
+    # Calculate input size
+    in_size = data_size + 24
+
+    # Make sure the sound data is all there before creating the output
+    available = len(snd_view) - offset
+    if available < in_size:
+        print(f"Error: Incomplete sound data for file {file_index}")
+        print(f"Expected {in_size} bytes, got {available} bytes")
+        return None
+
+    # Output WAV file goes in the subdirectory
+    out_path = output_dir / f"{source_file.stem}_{file_index}.wav"
+    return offset + in_size, (out_path, chunk_header[6:12], offset, in_size)
+
+
+def _write_sound_file(snd_view, infile, job: tuple) -> Tuple[Path, bool]:
+    """Write one WAV file; runs on the writer threads."""
+    out_path, fmt_chunk, data_offset, in_size = job
     try:
-        # Read chunk header
-        chunk_data = infile.read(40)
-        if len(chunk_data) != 40:
-            print(f"Error: Invalid chunk header size for file {file_index}")
-            return False
-
-        chunk_header = SNDChunkHeader(chunk_data)
-        print(f"\nProcessing file {file_index}:")
-        print(f"  Sample Rate: {chunk_header.SampleRate}")
-        print(f"  Channels: {chunk_header.ChannelCount}")
-        print(f"  Bits Per Sample: {chunk_header.SampleSize}")
-
-        # Calculate input size
-        in_size = chunk_header.DataSize + 24
-
-        # Read sound data
-        sound_data = infile.read(in_size)
-        if len(sound_data) != in_size:
-            print(f"Error: Incomplete sound data for file {file_index}")
-            print(f"Expected {in_size} bytes, got {len(sound_data)} bytes")
-            return False
-
-        # Create output WAV file in the subdirectory
-        out_path = output_dir / f"{source_file.stem}_{file_index}.wav"
         with open(out_path, 'wb') as outfile:
+            preallocate(outfile, WAV_HEADER_STRUCT.size + in_size)
+
             # Write WAV header structure
-            write_wav_header(outfile, chunk_header, in_size)
-            
-            # Write sound data
-            outfile.write(sound_data)
+            write_wav_header(outfile, fmt_chunk, in_size, _thread_header_buffer())
 
-        print(f"Created: {out_path}")
-        return True
+            # Copy sound data straight from the archive
+            copy_file_data(snd_view, infile, outfile, data_offset, in_size)
+        return out_path, True
 
     except Exception as e:
-        print(f"Error processing file {file_index}: {str(e)}")
-        return False
+        print(f"Error writing '{out_path}': {str(e)}")
+        return out_path, False
 
 
 def main():
@@ -185,11 +276,17 @@ def main():
     print('--------------------------------')
 
     import sys
-    if len(sys.argv) < 2:
-        print("Usage: python script.py <snd_file>")
+    args = sys.argv[1:]
+    verbose = '-v' in args or '--verbose' in args
+    args = [arg for arg in args if arg not in ('-v', '--verbose')]
+    if not args:
+        print("Usage: python script.py [-v] <snd_file>")
         sys.exit(1)
 
-    source_file = Path(sys.argv[1])
+    if verbose:
+        logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
+    source_file = Path(args[0])
     if not source_file.exists():
         print("Input file not found!")
         sys.exit(1)
@@ -1,142 +1,233 @@
 import os
 import sys
 import struct
+import logging
 from pathlib import Path
-from typing import Optional, List, Tuple
-from dataclasses import dataclass
+from typing import Optional, Iterator, Union
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants for file markers
-TEX_MARKER = struct.unpack('<I', b'TEXR')[0]
-DDS_MARKER = struct.unpack('<I', b'DDS ')[0]
+TEX_MARKER_BYTES = b'TEXR'
+DDS_MARKER_BYTES = b'DDS '
+TEX_MARKER = struct.unpack('<I', TEX_MARKER_BYTES)[0]
+DDS_MARKER = struct.unpack('<I', DDS_MARKER_BYTES)[0]
 
 # Pre-compile struct formats for better performance
 HEADER_STRUCT = struct.Struct('<3I')  # 3 DWORDs for TEX header
-MARKER_STRUCT = struct.Struct('<I')  # Single DWORD for markers
 
+log = logging.getLogger(__name__)
 
-@dataclass
-class TexHeader:
-    """Data class for TEX file header."""
-    Marker: int = TEX_MARKER
-    Version: int = 1
-    FileType: int = 0
+# Conversion is I/O bound, so batch mode keeps several files in flight per core
+CONVERT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-    def pack(self) -> bytes:
-        """Pack header into bytes."""
-        return HEADER_STRUCT.pack(self.Marker, self.Version, self.FileType)
+# Chunk size for copying texture data when os.sendfile is unavailable
+COPY_CHUNK_SIZE = 64 * 1024
 
 
-def read_file_header(file_path: Path) -> Optional[bytes]:
-    """Read and validate file header."""
-    try:
-        with open(file_path, 'rb') as f:
-            header_data = f.read(12)  # 3 DWORDs
-            if len(header_data) < 12:
-                print(f"Error: Incomplete header in {file_path}")
-                return None
-            return header_data
-    except Exception as e:
-        print(f"Error reading header from {file_path}: {e}")
-        return None
+# Every converted DDS gets the same default header, so pack it once
+DEFAULT_TEX_HEADER_BYTES = HEADER_STRUCT.pack(TEX_MARKER, 1, 0)  # Marker, Version, FileType
 
 
-def read_file_content(file_path: Path) -> Optional[bytes]:
-    """Read entire file content."""
+def fadvise(infile, advice_name: str) -> None:
+    """
+    Passes a posix_fadvise hint (e.g. 'POSIX_FADV_SEQUENTIAL') for the whole file.
+    No-op on platforms without posix_fadvise (e.g. Windows).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
     try:
-        with open(file_path, 'rb') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Error reading file {file_path}: {e}")
-        return None
-
-
-def write_file_content(file_path: Path, content: bytes) -> bool:
-    """Write content to file, creating directories if needed."""
+        os.posix_fadvise(infile.fileno(), 0, 0, getattr(os, advice_name))
+    except OSError as e:
+        log.debug("posix_fadvise failed for '%s': %s", infile.name, e)
+
+
+def copy_file_data(infile, outfile, size: int) -> int:
+    """Copy size bytes from the current position of infile to outfile and return the count copied.
+
+    Uses os.copy_file_range, which lets the filesystem share or clone the blocks, then
+    os.sendfile, so the data never passes through Python; falls back to a chunked
+    read/write loop where neither can be used.
+    """
+    offset = infile.tell()
+    copied = 0
+    outfile.flush()  # both calls write to the descriptor, behind anything already buffered
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                sent = os.copy_file_range(infile.fileno(), outfile.fileno(), size - copied, offset + copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            pass  # e.g. EXDEV across filesystems on older kernels
+    if copied < size and hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset + copied, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            pass  # e.g. macOS only allows sockets as the destination
+    infile.seek(offset + copied)
+
+    while copied < size:
+        chunk = infile.read(min(size - copied, COPY_CHUNK_SIZE))
+        if not chunk:
+            break
+        outfile.write(chunk)
+        copied += len(chunk)
+    return copied
+
+
+def stream_file_content(infile, file_path: Union[str, Path], header: bytes = b'') -> bool:
+    """Write header followed by the rest of infile to file_path, creating directories if needed.
+
+    The source is read once front to back, so its pages are dropped from
+    the page cache afterwards to keep large batches from evicting everything else.
+    """
     try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        size = max(os.fstat(infile.fileno()).st_size - infile.tell(), 0)
+        fadvise(infile, 'POSIX_FADV_SEQUENTIAL')
+        try:
+            f = open(file_path, 'wb')
+        except FileNotFoundError:
+            # Only the first file written into a new directory pays for creating it
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            f = open(file_path, 'wb')
+        with f:
+            f.write(header)
+            copied = copy_file_data(infile, f, size)
+        if copied < size:
+            print(f"Error writing file {file_path}: only {copied} of {size} bytes copied")
+            return False
+        fadvise(infile, 'POSIX_FADV_DONTNEED')
         return True
     except Exception as e:
         print(f"Error writing file {file_path}: {e}")
         return False
 
 
-def tex_convert_to_dds(source_file: Path, target_file: Path) -> bool:
+def tex_convert_to_dds(source_file: Union[str, Path], target_file: Union[str, Path]) -> bool:
     """Convert TEX file to DDS format."""
     try:
-        # Read and verify header
-        header_data = read_file_header(source_file)
-        if not header_data:
-            return False
-
-        marker, version, file_type = HEADER_STRUCT.unpack(header_data)
-        if marker != TEX_MARKER:
-            print(f"Error: Invalid TEX marker in {source_file}")
-            return False
-
-        # Read the DDS data
         with open(source_file, 'rb') as f:
-            f.seek(12)  # Skip header
-            dds_data = f.read()
+            # Read and verify header
+            header_data = f.read(12)  # 3 DWORDs
+            if len(header_data) < 12:
+                print(f"Error: Incomplete header in {source_file}")
+                return False
+
+            if header_data[:4] != TEX_MARKER_BYTES:
+                print(f"Error: Invalid TEX marker in {source_file}")
+                return False
 
-        # Write DDS file
-        return write_file_content(target_file, dds_data)
+            # Stream the DDS data that follows the header into the DDS file
+            return stream_file_content(f, target_file)
 
     except Exception as e:
         print(f"Error converting {source_file} to DDS: {e}")
         return False
 
 
-def dds_convert_to_tex(source_file: Path, target_file: Path) -> bool:
+def dds_convert_to_tex(source_file: Union[str, Path], target_file: Union[str, Path]) -> bool:
     """Convert DDS file to TEX format."""
     try:
-        # Read and verify DDS content
-        content = read_file_content(source_file)
-        if not content or len(content) < 4:
-            return False
+        with open(source_file, 'rb') as f:
+            # Verify the DDS marker
+            marker_data = f.read(4)
+            if len(marker_data) < 4:
+                return False
 
-        marker = MARKER_STRUCT.unpack(content[:4])[0]
-        if marker != DDS_MARKER:
-            print(f"Error: Invalid DDS marker in {source_file}")
-            return False
+            if marker_data != DDS_MARKER_BYTES:
+                print(f"Error: Invalid DDS marker in {source_file}")
+                return False
 
-        # Create TEX header and combine with DDS content
-        header = TexHeader()
-        return write_file_content(target_file, header.pack() + content)
+            # Stream the whole DDS file in behind the TEX header
+            f.seek(0)
+            return stream_file_content(f, target_file, DEFAULT_TEX_HEADER_BYTES)
 
     except Exception as e:
         print(f"Error converting {source_file} to TEX: {e}")
         return False
 
 
+def iter_files(root: Union[str, Path], suffix: str) -> Iterator[str]:
+    """Yield the path of every file below root whose name ends with suffix.
+
+    Walks with os.scandir so the file type comes from the cached directory
+    entry instead of a separate stat per path. Like Path.rglob, a root that
+    is missing or not a directory yields nothing.
+    """
+    if not os.path.isdir(root):
+        return
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif os.path.normcase(entry.name).endswith(suffix) and entry.is_file():
+                    yield entry.path
+
+
+def _is_up_to_date(source_file: str, target_file: str, size_delta: int,
+                   target_marker: Optional[bytes] = None) -> bool:
+    """Check whether target_file is at least as new as source_file and has the size converting it gives.
+
+    With target_marker, the target must also start with it, so a file cut short
+    or left over from something else is converted again.
+    """
+    try:
+        target_stat = os.stat(target_file)
+    except OSError:
+        return False
+    source_stat = os.stat(source_file)
+    if (target_stat.st_mtime < source_stat.st_mtime or
+            target_stat.st_size != source_stat.st_size + size_delta):
+        return False
+    if target_marker is None:
+        return True
+    try:
+        with open(target_file, 'rb') as f:
+            return f.read(len(target_marker)) == target_marker
+    except OSError:
+        return False
+
+
 def process_files_in_directory(source_folder: Path, target_folder: Path, 
                              process_func, source_ext: str, target_ext: str,
-                             delete_source: bool = False) -> bool:
-    """Generic function to process files in a directory."""
+                             delete_source: bool = False, size_delta: Optional[int] = None,
+                             force: bool = False, target_marker: Optional[bytes] = None) -> bool:
+    """Generic function to process files in a directory, converting them on a thread pool.
+
+    Paths are handled as plain strings here; scandir already yields them below
+    source_folder, so the relative part is just a prefix slice.
+    Conversion only adds or strips a fixed-size header, so when size_delta is
+    given, existing targets with the expected size (and target_marker, if given)
+    that are newer than their source are skipped unless force is set.
+    """
     try:
         success = True
-        for item in source_folder.rglob(f'*.{source_ext}'):
-            if not item.is_file():
+        jobs = []
+        source_prefix_len = len(os.path.join(str(source_folder), ''))
+        target_root = str(target_folder)
+        source_suffix = f'.{source_ext}'
+        target_suffix = f'.{target_ext}'
+        for item in iter_files(source_folder, source_suffix):
+            # Create corresponding target path
+            rel_stem = item[source_prefix_len:-len(source_suffix)]
+            target_file = os.path.join(target_root, rel_stem + target_suffix)
+            if size_delta is not None and not force and _is_up_to_date(item, target_file, size_delta, target_marker):
+                log.debug('Up to date: %s', target_file)
+                success = _report_conversion(item, True, delete_source) and success
                 continue
+            jobs.append((item, target_file))
 
-            # Create corresponding target path
-            rel_path = item.relative_to(source_folder)
-            target_file = target_folder / rel_path.with_suffix(f'.{target_ext}')
-
-            print(f'Converting: {item}')
-            if process_func(item, target_file):
-                print('Converting successful')
-                if delete_source:
-                    try:
-                        item.unlink()
-                        print(f'Deleted source file: {item}')
-                    except Exception as del_e:
-                        print(f"Failed to delete '{item}': {del_e}")
-                        success = False
-            else:
-                print('Converting failed')
-                success = False
+        with ThreadPoolExecutor(max_workers=CONVERT_WORKERS) as executor:
+            results = executor.map(lambda job: process_func(*job), jobs)
+            for (item, _), converted in zip(jobs, results):
+                success = _report_conversion(item, converted, delete_source) and success
 
         return success
     except Exception as e:
@@ -144,16 +235,38 @@ def process_files_in_directory(source_folder: Path, target_folder: Path,
         return False
 
 
-def batch_convert_tex_to_dds(source_folder: Path, target_folder: Path, delete_source: bool = False) -> bool:
+def _report_conversion(item: str, converted: bool, delete_source: bool) -> bool:
+    """Print the outcome of one batch conversion and delete its source if requested."""
+    success = True
+    if converted:
+        log.debug('Converting successful: %s', item)
+        if delete_source:
+            try:
+                os.remove(item)
+                log.debug('Deleted source file: %s', item)
+            except Exception as del_e:
+                print(f"Failed to delete '{item}': {del_e}")
+                success = False
+    else:
+        print(f'Converting failed: {item}')
+        success = False
+    return success
+
+
+def batch_convert_tex_to_dds(source_folder: Path, target_folder: Path, delete_source: bool = False,
+                             force: bool = False) -> bool:
     """Batch convert all TEX files in folder to DDS."""
     return process_files_in_directory(source_folder, target_folder, tex_convert_to_dds, 
-                                    'tex', 'dds', delete_source)
+                                    'tex', 'dds', delete_source, -HEADER_STRUCT.size, force,
+                                    DDS_MARKER_BYTES)
 
 
-def batch_convert_dds_to_tex(source_folder: Path, target_folder: Path, delete_source: bool = False) -> bool:
+def batch_convert_dds_to_tex(source_folder: Path, target_folder: Path, delete_source: bool = False,
+                             force: bool = False) -> bool:
     """Batch convert all DDS files in folder to TEX."""
     return process_files_in_directory(source_folder, target_folder, dds_convert_to_tex, 
-                                    'dds', 'tex', delete_source)
+                                    'dds', 'tex', delete_source, HEADER_STRUCT.size, force,
+                                    TEX_MARKER_BYTES)
 
 
 def main():
@@ -164,10 +277,15 @@ def main():
     parser.add_argument('-tex', action='store_true', help='Convert TEX to DDS')
     parser.add_argument('-dds', action='store_true', help='Convert DDS to TEX')
     parser.add_argument('-d', action='store_true', help='Delete source files after conversion')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='Batch mode: convert files even if their output is up to date')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Report every converted file')
     parser.add_argument('source', help='Source file or directory')
     parser.add_argument('target', nargs='?', help='Target directory (optional)')
 
     args = parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 
     print('--------------------------------')
     print('TEX Converter v0.1')
@@ -182,13 +300,13 @@ def main():
         if args.tex:
             print('Converting tex files started...')
             print('--------------------------------')
-            success = batch_convert_tex_to_dds(source_path, target_path, args.d)
+            success = batch_convert_tex_to_dds(source_path, target_path, args.d, args.force)
             print('--------------------------------')
             print('Converting tex files finished...')
         elif args.dds:
             print('Converting dds files started...')
             print('--------------------------------')
-            success = batch_convert_dds_to_tex(source_path, target_path, args.d)
+            success = batch_convert_dds_to_tex(source_path, target_path, args.d, args.force)
             print('--------------------------------')
             print('Converting dds files finished...')
         else:
@@ -5,8 +5,13 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QTabWidget,
                              QPushButton, QVBoxLayout, QHBoxLayout, QLabel,
                              QFileDialog, QProgressBar, QTextEdit, QGroupBox,
                              QCheckBox, QComboBox,)
-from PyQt6.QtCore import  QThread, pyqtSignal
+from PyQt6.QtCore import  Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
 import io
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from contextlib import redirect_stdout
 
 # Import your existing tools
@@ -15,8 +20,45 @@ from BndlExtractor import extract_bundle_file, batch_extract_bndl
 from SNDExtractor import convert_sound_to_wave
 from TexConverter import (tex_convert_to_dds, dds_convert_to_tex,
                           batch_convert_tex_to_dds, batch_convert_dds_to_tex)
-from dsPACKExtractor import DSPackFile, MiniPackDecompressor
+from dsPACKExtractor import DSPackFile, NATIVE_MINIPACK, EXTRACT_WORKERS
 
+# Workers for batch dsPack extraction; one core is left for the UI
+DSPACK_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+# File dialog name filters for each tool
+ARCH_FILTER = "FEAR Files (*.arch00 *.arch01)"
+BNDL_FILTER = "FEAR Files (*.bndl)"
+SND_FILTER = "FEAR Files (*.snd)"
+TEX_FILTER = "FEAR Files (*.tex *.dds)"
+DSPACK_FILTER = "FEAR Files (*.dspack)"
+
+
+class ProgressWriter(io.TextIOBase):
+    """Stand-in for stdout that hands each printed line to emit as soon as it is complete."""
+
+    def __init__(self, emit):
+        super().__init__()
+        self.emit = emit
+        self.pending = ''
+        self.lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        with self.lock:
+            lines = (self.pending + text).split('\n')
+            self.pending = lines.pop()
+        for line in lines:
+            self.emit(line)
+        return len(text)
+
+    def finish(self):
+        """Emit whatever was printed after the last newline."""
+        with self.lock:
+            line, self.pending = self.pending, ''
+        if line:
+            self.emit(line)
 
 class WorkerThread(QThread):
     progress = pyqtSignal(str)
@@ -28,101 +70,67 @@ class WorkerThread(QThread):
         self.args = args
         self.kwargs = kwargs
 
+    def start(self, priority=QThread.Priority.LowPriority):
+        """Start below the GUI thread's priority so the window stays responsive under full load."""
+        super().start(priority)
+
     def run(self):
         try:
-            # Capture all stdout to our progress signal
-            output = io.StringIO()
+            # Stream stdout to our progress signal line by line
+            output = ProgressWriter(self.progress.emit)
             with redirect_stdout(output):
                 result = self.function(*self.args, **self.kwargs)
-                
-            # Send captured output to log
-            output_str = output.getvalue()
-            if output_str:
-                for line in output_str.splitlines():
-                    self.progress.emit(line)
-                    
+            output.finish()
+
             self.finished.emit(result)
         except Exception as e:
             self.progress.emit(f"Error: {str(e)}")
             self.finished.emit(False)
 
 class DSPackWrapper(DSPackFile):
-    def __init__(self, filename, progress_callback=None):
+    # Messages collected before they are sent to the progress callback as one block
+    flush_threshold = 32
+
+    def __init__(self, filename, progress_callback=None, quiet=False):
         super().__init__(filename)
         self.progress_callback = progress_callback
-
-    def print_message(self, message):
-        """Override print to use the progress callback"""
-        if self.progress_callback:
-            self.progress_callback(message)
-        else:
-            print(message)
-
-    def analyze(self):
-        """Override analyze to use custom print"""
-        # Read all directory structures
-        self.read_header()
-        self.read_names_directory()
-        self.read_file_entries()
-        self.read_folder_entries()
-        
-        # Build folder paths
-        folder_paths = self.build_folder_paths()
-        
-        # Print analysis
-        self.print_message(f"\n[Archive Analysis: {os.path.basename(self.filename)}]")
-        self.print_message(f"{'=' * 50}")
-        self.print_message(f"Format: {'Big-endian' if self.big_endian else 'Little-endian'}")
-        self.print_message(f"Files: {len(self.files)}")
-        self.print_message(f"Folders: {len(self.folders)}")
-        
-        self.print_message("\n[Folder Structure]")
-        for i, path in folder_paths.items():
-            folder = self.folders[i]
-            file_count = folder['last_file'] - folder['first_file'] + 1 if folder['first_file'] >= 0 else 0
-            self.print_message(f"  {path}/ ({file_count} files)")
-        
-        self.print_message("\n[Sample Files]")
-        for file in self.files[:5]:  # Show first 5 files
-            comp_ratio = (1 - file['compressed_size'] / file['decompressed_size']) * 100 if file['decompressed_size'] > 0 else 0
-            self.print_message(f"  * {file['name']}")
-            self.print_message(f"    Size: {file['decompressed_size']:,} bytes")
-            if comp_ratio > 0:
-                self.print_message(f"    Compression: {comp_ratio:.1f}%")
-            self.print_message("")
-
-    def extract_file(self, file_entry):
-        """Override extract_file to use custom print"""
-        if file_entry['compressed_size'] == 0:
-            return None, False
-        
-        # Read the compressed data
-        self.file.seek(file_entry['data_offset'])
-        compressed_data = self.file.read(file_entry['compressed_size'])
-        
-        # If the file is not compressed, return it as-is
-        if file_entry['compressed_size'] == file_entry['decompressed_size']:
-            self.print_message("  > File is not compressed")
-            return compressed_data, False
-        
-        # Basic validation check: ensure compressed data is smaller than decompressed size
-        if len(compressed_data) >= file_entry['decompressed_size']:
-            self.print_message("(!!) Invalid compression: compressed size larger than decompressed size")
-            return compressed_data, True
-        
-        # Try to decompress the data
+        self.quiet = quiet  # Drop per-file and per-folder detail lines
+
+    def print_fmt(self, fmt, *args):
+        """Format detail lines only when they will be shown"""
+        if not self.quiet:
+            self.print_message(fmt.format(*args))
+
+    def flush_messages(self):
+        """Send the collected messages to the progress callback"""
+        if not self.progress_callback:
+            return super().flush_messages()
+        if self._msg_batch:
+            batch, self._msg_batch = self._msg_batch, []
+            self.progress_callback("\n".join(batch))
+
+def _extract_one_dspack(file_path, output_dir, progress_queue, extract_workers):
+    """
+    Pool worker: extract one dsPack file on extract_workers threads,
+    sending progress lines through progress_queue.
+    """
+    try:
+        # Batch logs keep each archive's summary but not a line per file
+        with DSPackWrapper(file_path, progress_queue.put, quiet=True) as dspack:
+            dspack.analyze()
+            dspack.extract_all_files(output_dir, extract_workers)
+        return True
+    except Exception as e:
+        progress_queue.put(f"Error extracting {file_path}: {str(e)}")
+        return False
+
+def _drain_progress(progress_queue, emit):
+    """Forward every message waiting in progress_queue to emit."""
+    while True:
         try:
-            decompressor = MiniPackDecompressor()
-            data = decompressor.decompress(compressed_data, file_entry['decompressed_size'])
-            self.print_message(f"  > Successfully decompressed ({file_entry['compressed_size']:,} -> {len(data):,} bytes)")
-            return data, False
-        except IndexError:
-            # For bytearray index out of range errors, extract the file as-is
-            self.print_message("(!!) Unknown compression format: extracting as-is")
-            return compressed_data, True
-        except (KeyboardInterrupt, Exception) as e:
-            self.print_message(f"(!!) Decompression error: {str(e)}")
-            return compressed_data, True
+            emit(progress_queue.get_nowait())
+        except queue.Empty:
+            return
 
 class FearToolsGUI(QMainWindow):
     def create_arch_tab(self):
@@ -136,7 +144,7 @@ class FearToolsGUI(QMainWindow):
         file_layout = QHBoxLayout()
         self.arch_file_label = QLabel("No file selected")
         select_file_btn = QPushButton("Select ARCH File")
-        select_file_btn.clicked.connect(lambda: self.select_file("arch00, arch01", self.arch_file_label))
+        select_file_btn.clicked.connect(lambda: self.select_file(ARCH_FILTER, self.arch_file_label))
         file_layout.addWidget(select_file_btn)
         file_layout.addWidget(self.arch_file_label)
         file_layout.addStretch()
@@ -204,7 +212,7 @@ class FearToolsGUI(QMainWindow):
         file_layout = QHBoxLayout()
         self.bndl_file_label = QLabel("No file selected")
         select_file_btn = QPushButton("Select BNDL File")
-        select_file_btn.clicked.connect(lambda: self.select_file("bndl", self.bndl_file_label))
+        select_file_btn.clicked.connect(lambda: self.select_file(BNDL_FILTER, self.bndl_file_label))
         file_layout.addWidget(select_file_btn)
         file_layout.addWidget(self.bndl_file_label)
         file_layout.addStretch()
@@ -272,7 +280,7 @@ class FearToolsGUI(QMainWindow):
         file_layout = QHBoxLayout()
         self.snd_file_label = QLabel("No file selected")
         select_file_btn = QPushButton("Select SND File")
-        select_file_btn.clicked.connect(lambda: self.select_file("snd", self.snd_file_label))
+        select_file_btn.clicked.connect(lambda: self.select_file(SND_FILTER, self.snd_file_label))
         file_layout.addWidget(select_file_btn)
         file_layout.addWidget(self.snd_file_label)
         file_layout.addStretch()
@@ -311,7 +319,7 @@ class FearToolsGUI(QMainWindow):
         file_layout = QHBoxLayout()
         self.tex_file_label = QLabel("No file selected")
         select_file_btn = QPushButton("Select File")
-        select_file_btn.clicked.connect(lambda: self.select_file("tex,dds", self.tex_file_label))
+        select_file_btn.clicked.connect(lambda: self.select_file(TEX_FILTER, self.tex_file_label))
         file_layout.addWidget(select_file_btn)
         file_layout.addWidget(self.tex_file_label)
         file_layout.addStretch()
@@ -387,7 +395,7 @@ class FearToolsGUI(QMainWindow):
         file_layout = QHBoxLayout()
         self.dspack_file_label = QLabel("No file selected")
         select_file_btn = QPushButton("Select dsPack File")
-        select_file_btn.clicked.connect(lambda: self.select_file("dspack", self.dspack_file_label))
+        select_file_btn.clicked.connect(lambda: self.select_file(DSPACK_FILTER, self.dspack_file_label))
         file_layout.addWidget(select_file_btn)
         file_layout.addWidget(self.dspack_file_label)
         file_layout.addStretch()
@@ -595,27 +603,53 @@ class FearToolsGUI(QMainWindow):
                 dspack.extract_all_files(output_dir)
             return True
         except Exception as e:
-            self.log_message(f"Error extracting {file_path}: {str(e)}")
+            # Runs on the worker thread: go through the progress signal, not the GUI-thread log buffer
+            self.worker.progress.emit(f"Error extracting {file_path}: {str(e)}")
             return False
 
     def _extract_batch_dspack(self, folder_path, output_dir):
-        """Extract all dsPack files in a folder"""
+        """Extract all dsPack files in a folder, one worker per archive"""
         try:
-            success = True
-            for file in folder_path.glob("*.dspack"):
-                try:
-                    output_subdir = output_dir / file.stem
-                    with DSPackWrapper(file, self.worker.progress.emit) as dspack:
-                        dspack.analyze()
-                        dspack.extract_all_files(output_subdir)
-                except Exception as e:
-                    self.log_message(f"Error extracting {file}: {str(e)}")
-                    success = False
-            return success
+            with os.scandir(folder_path) as entries:
+                files = [Path(entry.path) for entry in entries
+                         if entry.name.lower().endswith('.dspack') and entry.is_file()]
+            if not files:
+                return True
+
+            workers = min(len(files), DSPACK_WORKERS)
+            # Each archive extracts on its own threads too; split the budget so the total stays near DSPACK_WORKERS
+            extract_workers = max(1, min(EXTRACT_WORKERS, DSPACK_WORKERS // workers))
+            if NATIVE_MINIPACK:
+                # The compiled decoder releases the GIL, so threads decompress in parallel
+                # without sending progress through a manager process
+                return self._run_dspack_jobs(ThreadPoolExecutor(max_workers=workers),
+                                             files, output_dir, queue.SimpleQueue(), extract_workers)
+            # Spawn rather than fork: forking the multi-threaded Qt process is not safe
+            context = multiprocessing.get_context('spawn')
+            with context.Manager() as manager:
+                return self._run_dspack_jobs(ProcessPoolExecutor(max_workers=workers, mp_context=context),
+                                             files, output_dir, manager.Queue(), extract_workers)
         except Exception as e:
-            self.log_message(f"Error processing folder {folder_path}: {str(e)}")
+            self.worker.progress.emit(f"Error processing folder {folder_path}: {str(e)}")
             return False
 
+    def _run_dspack_jobs(self, executor, files, output_dir, progress_queue, extract_workers):
+        """Extract each file on executor, forwarding progress_queue to the log until all are done"""
+        success = True
+        emit = self.worker.progress.emit
+        with executor:
+            pending = {executor.submit(_extract_one_dspack, file, output_dir / file.stem, progress_queue,
+                                       extract_workers)
+                       for file in files}
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                _drain_progress(progress_queue, emit)
+                for future in done:
+                    if not future.result():
+                        success = False
+            _drain_progress(progress_queue, emit)
+        return success
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("F.E.A.R. Tools")
@@ -627,27 +661,61 @@ class FearToolsGUI(QMainWindow):
         layout = QVBoxLayout(main_widget)
 
         # Create tab widget
-        tabs = QTabWidget()
-        layout.addWidget(tabs)
-
-        # Add tabs for each tool
-        tabs.addTab(self.create_arch_tab(), "ARCH Extractor")
-        tabs.addTab(self.create_bndl_tab(), "BNDL Extractor")
-        tabs.addTab(self.create_snd_tab(), "SND Converter")
-        tabs.addTab(self.create_tex_tab(), "TEX Converter")
-        tabs.addTab(self.create_dspack_tab(), "dsPack Extractor")
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+
+        # Add tabs for each tool; each one is built the first time it is shown
+        self._tab_builders = [
+            (self.create_arch_tab, "ARCH Extractor"),
+            (self.create_bndl_tab, "BNDL Extractor"),
+            (self.create_snd_tab, "SND Converter"),
+            (self.create_tex_tab, "TEX Converter"),
+            (self.create_dspack_tab, "dsPack Extractor"),
+        ]
+        self._built_tabs = set()
+        for _, title in self._tab_builders:
+            self.tabs.addTab(QWidget(), title)
+        self.tabs.currentChanged.connect(self._ensure_tab_built)
+        self._ensure_tab_built(self.tabs.currentIndex())
 
         # Status area at the bottom
         self.log_output = QTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setMaximumHeight(100)
+        # Keep only the most recent lines; Qt drops the oldest blocks as new ones arrive
+        self.log_output.document().setMaximumBlockCount(2000)
         layout.addWidget(self.log_output)
 
+        # Log messages are queued and added to the log output in batches
+        self._log_buffer = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(75)
+        self._log_timer.timeout.connect(self._flush_log)
+        self._log_timer.start()
+
         self.progress_bar = QProgressBar()
         layout.addWidget(self.progress_bar)
 
         self.apply_styles()
 
+    def _ensure_tab_built(self, index):
+        """Replace the placeholder at index with the real tab the first time it is shown"""
+        if index < 0 or index in self._built_tabs:
+            return
+        self._built_tabs.add(index)
+        builder, title = self._tab_builders[index]
+        placeholder = self.tabs.widget(index)
+
+        # Swapping the widget changes the current tab, which must not re-enter here
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, builder(), title)
+            self.tabs.setCurrentIndex(index)
+        finally:
+            self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
     def apply_styles(self):
         """Apply the dark theme styling to all widgets"""
         self.setStyleSheet("""
@@ -733,19 +801,38 @@ class FearToolsGUI(QMainWindow):
         """)
 
     def log_message(self, message):
-        """Add message to log output"""
-        self.log_output.append(message)
+        """Queue message for the log output; GUI thread only, workers send theirs through worker.progress"""
+        self._log_buffer.append(message)
+
+    def _flush_log(self):
+        """Add all queued messages to the log output in a single edit"""
+        if not self._log_buffer:
+            return
+        messages, self._log_buffer = self._log_buffer, []
+
+        cursor = self.log_output.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not self.log_output.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(messages))
+
         # Ensure the latest message is visible
         self.log_output.verticalScrollBar().setValue(
             self.log_output.verticalScrollBar().maximum()
         )
 
-    def select_file(self, extensions, label):
-        """File selection dialog"""
-        extensions = extensions.split(',')
-        filter_str = f"FEAR Files ({' '.join(f'*.{ext}' for ext in extensions)})"
-        file_name, _ = QFileDialog.getOpenFileName(
-            self, f"Select file", "", filter_str)
+    def select_file(self, filter_str, label):
+        """File selection dialog, opened without blocking the event loop while it lists large folders"""
+        dialog = QFileDialog(self, "Select file", "", filter_str)
+        dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+        dialog.setOption(QFileDialog.Option.DontResolveSymlinks, True)
+        dialog.setOption(QFileDialog.Option.DontUseCustomDirectoryIcons, True)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.fileSelected.connect(lambda file_name: self._on_file_selected(file_name, label))
+        dialog.open()
+
+    def _on_file_selected(self, file_name, label):
+        """Store the file picked in the dialog opened by select_file"""
         if file_name:
             self.current_file = Path(file_name)
             label.setText(str(self.current_file))
@@ -1,9 +1,39 @@
 import os
+import sys
+import mmap
+import bisect
+import queue
 import struct
-import re
+from collections import Counter
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
 
+try:
+    # Optional: compiles the MiniPack inner loop to machine code
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
+# Threads extracting the files of one archive at once
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Smallest pooled decompression buffer, so runs of small files keep reusing the same one
+OUTPUT_BUFFER_MIN_SIZE = 64 * 1024
+
+# Header: magic (8 bytes), padding (4 bytes), then file, folder and names directory
+# counts/lengths/offsets as 8 DWORDs; keyed by endianness (big_endian flag) like the entries below
+HEADER_SIZE = 44
+HEADER_STRUCTS = {False: struct.Struct('<8I'), True: struct.Struct('>8I')}
+
+# Directory entries by endianness (big_endian flag).
+# File: name offset, parent folder (signed, -1 for none), decompressed size, compressed size, unknown, data offset
+FILE_ENTRY_STRUCTS = {False: struct.Struct('<IiIIII'), True: struct.Struct('>IiIIII')}
+# Folder: name offset, parent folder, last subfolder, first subfolder, first file, last file (all signed but the name)
+FOLDER_ENTRY_STRUCTS = {False: struct.Struct('<I5i'), True: struct.Struct('>I5i')}
+
 @dataclass
 class Section:
     offset: int
@@ -31,26 +61,34 @@ class ResourceEntry:
         """Guess the file extension based on the name."""
         if not self.name:
             return None
-        ext_match = re.search(r'\.([a-zA-Z0-9]+)$', self.name.lower())
-        return ext_match.group(1) if ext_match else None
+        # Whatever follows the last dot, if it is a non-empty run of ASCII letters and digits
+        ext = self.name.rpartition('.')[2].lower() if '.' in self.name else ''
+        return ext if ext.isascii() and ext.isalnum() else None
 
 class FileSystemEntry:
     def __init__(self, path, source_pack):
         self.path = path
         self.source_pack = source_pack
         self.children = {}
-        self.is_file = '.' in path.split('/')[-1]
-        self.extension = path.split('.')[-1] if self.is_file else None
+        self.child_order = []  # (not is_file, name) of each child, kept sorted for print_tree
+        self.is_file = '.' in path.rpartition('/')[2]
+        self.extension = path.rpartition('.')[2] if self.is_file else None
 
     def add_child(self, name):
-        if name not in self.children:
-            self.children[name] = FileSystemEntry(name, self.source_pack)
-        return self.children[name]
+        child = self.children.get(name)
+        if child is None:
+            child = self.children[name] = FileSystemEntry(name, self.source_pack)
+            bisect.insort(self.child_order, (not child.is_file, name))
+        return child
+
+    def sorted_children(self):
+        """Children with files first, each group ordered by name."""
+        return [self.children[name] for _, name in self.child_order]
 
 class FileSystem:
     def __init__(self):
         self.root = FileSystemEntry("/", None)
-        self.extension_stats = {}
+        self.extension_stats = Counter()
 
     def add_path(self, path, source_pack):
         if not path.startswith('/'):
@@ -62,7 +100,7 @@ class FileSystem:
         for part in parts:
             current = current.add_child(part)
             if current.is_file and current.extension:
-                self.extension_stats[current.extension] = self.extension_stats.get(current.extension, 0) + 1
+                self.extension_stats[current.extension] += 1
 
     def print_tree(self, node=None, indent=0, max_depth=5):
         if node is None:
@@ -71,18 +109,22 @@ class FileSystem:
         if indent > max_depth:
             return
 
-        prefix = "  " * indent
-        if node.is_file:
-            print(f"{prefix}- {node.path} ({node.source_pack})")
-        else:
-            print(f"{prefix}+ {node.path}/")
+        # Depth-first with an explicit stack; children go on in reverse so they come off in order
+        stack = [(node, indent)]
+        while stack:
+            node, indent = stack.pop()
+            prefix = "  " * indent
+            if node.is_file:
+                print(f"{prefix}- {node.path} ({node.source_pack})")
+            else:
+                print(f"{prefix}+ {node.path}/")
             
-        for child in sorted(node.children.values(), key=lambda x: (not x.is_file, x.path)):
-            self.print_tree(child, indent + 1, max_depth)
+            if indent < max_depth:
+                stack.extend((child, indent + 1) for child in reversed(node.sorted_children()))
 
     def print_stats(self):
         print("\nFile Extension Statistics:")
-        for ext, count in sorted(self.extension_stats.items(), key=lambda x: x[1], reverse=True):
+        for ext, count in self.extension_stats.most_common():
             print(f"{ext}: {count} files")
 
 class MiniPackDecompressor:
@@ -94,67 +136,285 @@ class MiniPackDecompressor:
         
     def decompress(self, compressed_data: bytes, decompressed_size: int) -> bytes:
         """Decompress MiniPack compressed data."""
+        output = bytearray(decompressed_size)
+        self.decompress_into(compressed_data, output)
+        return bytes(output)
+
+    def decompress_into(self, compressed_data: bytes, output) -> int:
+        """
+        Decompress MiniPack compressed data into output, a zero-filled writable buffer
+        of the decompressed size, and return the number of bytes written.
+        Runs the numba-compiled loop when numba is installed.
+        """
+        if _minipack_native is None:
+            return self.decompress_python(compressed_data, output)
+        written = _minipack_native(np.frombuffer(compressed_data, dtype=np.uint8),
+                                   np.frombuffer(output, dtype=np.uint8))
+        if written < 0:
+            raise IndexError("MiniPack back reference out of range")
+        self.output_pos = written
+        return written
+
+    def decompress_python(self, compressed_data: bytes, output) -> int:
+        """The decompress_into loop in plain Python."""
         self.input_data = compressed_data
-        self.output_data = bytearray(decompressed_size)
-        self.input_pos = 0
-        self.output_pos = 0
+        self.output_data = output
+        # The loop works on locals; the positions are stored back on the way out
+        input_data = compressed_data
+        output_data = output
+        input_len = len(input_data)
+        output_len = len(output_data)
+        input_pos = 0
+        output_pos = 0
         
-        while self.input_pos < len(self.input_data):
-            # Read control byte
-            control = self.input_data[self.input_pos]
-            self.input_pos += 1
-            
-            # Process each bit in control byte
-            for bit in range(8):
-                if self.input_pos >= len(self.input_data):
-                    break
-                    
-                if (control & (1 << bit)) != 0:
-                    # Literal byte
-                    self.output_data[self.output_pos] = self.input_data[self.input_pos]
-                    self.output_pos += 1
-                    self.input_pos += 1
-                else:
-                    # Back reference
-                    if self.input_pos + 1 >= len(self.input_data):
+        try:
+            while input_pos < input_len:
+                # Read control byte
+                control = input_data[input_pos]
+                input_pos += 1
+                
+                # Process each bit in control byte
+                for bit in range(8):
+                    if input_pos >= input_len:
                         break
                         
-                    # Read offset and length
-                    offset = ((self.input_data[self.input_pos + 1] & 0xF0) << 4) | self.input_data[self.input_pos]
-                    length = (self.input_data[self.input_pos + 1] & 0x0F) + 3
-                    
-                    # Copy bytes from back reference
-                    for i in range(length):
-                        self.output_data[self.output_pos] = self.output_data[self.output_pos - offset]
-                        self.output_pos += 1
+                    if (control & (1 << bit)) != 0:
+                        # Literal byte
+                        output_data[output_pos] = input_data[input_pos]
+                        output_pos += 1
+                        input_pos += 1
+                    else:
+                        # Back reference
+                        if input_pos + 1 >= input_len:
+                            break
+                            
+                        # Read offset and length
+                        offset = ((input_data[input_pos + 1] & 0xF0) << 4) | input_data[input_pos]
+                        length = (input_data[input_pos + 1] & 0x0F) + 3
                         
-                    self.input_pos += 2
-                    
-                if self.output_pos >= len(self.output_data):
-                    break
+                        # Copy bytes from back reference
+                        start = output_pos - offset
+                        end = output_pos + length
+                        if end > output_len:
+                            raise IndexError("MiniPack back reference runs past the output")
+                        if start < 0 or offset == 0:
+                            # References before the start wrap around to the end of the output
+                            for i in range(length):
+                                output_data[output_pos + i] = output_data[start + i]
+                        elif offset >= length:
+                            # Source and destination don't overlap: one block copy
+                            output_data[output_pos:end] = output_data[start:start + length]
+                        elif offset == 1:
+                            # Run of one byte
+                            output_data[output_pos:end] = bytes((output_data[start],)) * length
+                        else:
+                            # Overlapping copy repeats the last offset bytes
+                            pattern = bytes(output_data[start:output_pos])
+                            output_data[output_pos:end] = (pattern * (length // offset + 1))[:length]
+                        output_pos = end
+                            
+                        input_pos += 2
+                        
+                    if output_pos >= output_len:
+                        break
+        finally:
+            self.input_pos = input_pos
+            self.output_pos = output_pos
         
-        return bytes(self.output_data)
+        return output_pos
+
+# Longest MiniPack back reference (4-bit length + 3)
+MINIPACK_MAX_LENGTH = 18
+
+def _minipack_kernel(src, dst):
+    """
+    The MiniPackDecompressor.decompress_python loop over uint8 arrays, for numba to compile.
+    Returns -1 wherever the bytearray version would raise IndexError, otherwise the bytes written.
+    dst need not be zero-filled: bytes from output_pos on are taken as zero wherever they are
+    read, and whatever is left of them is cleared at the end.
+    """
+    src_len = len(src)
+    dst_len = len(dst)
+    input_pos = 0
+    output_pos = 0
+    while input_pos < src_len:
+        control = src[input_pos]
+        input_pos += 1
+        # Eight tokens take at most 16 bytes, so only the last group can run out of input;
+        # elsewhere the per-token checks drop out and the bit loop has a fixed trip count
+        tail = input_pos + 2 * 8 > src_len
+        for bit in range(8):
+            if tail and input_pos >= src_len:
+                break
+            if control & 1:
+                # Literal byte
+                if output_pos >= dst_len:
+                    return -1
+                dst[output_pos] = src[input_pos]
+                output_pos += 1
+                input_pos += 1
+            else:
+                # Back reference
+                if tail and input_pos + 1 >= src_len:
+                    break
+                offset = ((src[input_pos + 1] & 0xF0) << 4) | src[input_pos]
+                length = (src[input_pos + 1] & 0x0F) + 3
+                start = output_pos - offset
+                if offset >= MINIPACK_MAX_LENGTH and start >= 0 and output_pos + MINIPACK_MAX_LENGTH <= dst_len:
+                    # Copy a fixed-size block whatever the length; the bytes past it are rewritten
+                    # by what follows or cleared at the end
+                    for i in range(MINIPACK_MAX_LENGTH):
+                        dst[output_pos + i] = dst[start + i]
+                    output_pos += length
+                else:
+                    for i in range(length):
+                        if output_pos >= dst_len:
+                            return -1
+                        ref = output_pos - offset
+                        if ref < 0:
+                            # Negative indexes wrap around, as they do on the bytearray
+                            ref += dst_len
+                            if ref < 0:
+                                return -1
+                        # Unwritten bytes (wrap-around or a zero offset) read as zero
+                        dst[output_pos] = dst[ref] if ref < output_pos else 0
+                        output_pos += 1
+                input_pos += 2
+            if output_pos >= dst_len:
+                break
+            control >>= 1
+    for i in range(output_pos, dst_len):
+        dst[i] = 0
+    return output_pos
+
+# nogil lets several threads decompress at once; boundscheck stays off, the kernel checks its own indexes
+_minipack_native = (numba.njit(cache=True, nogil=True, boundscheck=False)(_minipack_kernel)
+                    if numba is not None else None)
+NATIVE_MINIPACK = _minipack_native is not None
+
+def decompress_minipack_into(compressed_data: bytes, output) -> int:
+    """
+    Decompress MiniPack data into output, a writable buffer of the decompressed size,
+    with the compiled loop when numba is installed. Returns the number of bytes written.
+    """
+    if _minipack_native is None:
+        # Unwritten bytes and early back references read as zero; the compiled loop sees to that itself
+        output[:] = bytes(len(output))
+    return MiniPackDecompressor().decompress_into(compressed_data, output)
+
+def decompress_minipack(compressed_data: bytes, decompressed_size: int) -> bytes:
+    """Decompress MiniPack data, with the compiled loop when numba is installed."""
+    if _minipack_native is None:
+        output = bytearray(decompressed_size)
+    else:
+        output = np.empty(decompressed_size, dtype=np.uint8)  # The compiled loop writes every byte
+    decompress_minipack_into(compressed_data, output)
+    return bytes(output)
+
+def write_output_file(path, data, source_fd=None, source_offset=0) -> None:
+    """
+    Write data to path with os.write on a raw descriptor, skipping the buffered file object.
+    When data is a slice of the file source_fd starting at source_offset, it is copied
+    inside the kernel instead, with os.copy_file_range (which filesystems can turn into
+    a reflink) or os.sendfile, where those are available.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with memoryview(data) as view:
+            written = 0
+            if source_fd is not None and hasattr(os, 'copy_file_range'):
+                try:
+                    while written < len(view):
+                        copied = os.copy_file_range(source_fd, fd, len(view) - written, source_offset + written)
+                        if copied == 0:
+                            break
+                        written += copied
+                except OSError:
+                    pass  # e.g. EXDEV across filesystems on older kernels; sendfile picks up from here
+            if source_fd is not None and written < len(view) and hasattr(os, 'sendfile'):
+                try:
+                    while written < len(view):
+                        sent = os.sendfile(fd, source_fd, source_offset + written, len(view) - written)
+                        if sent == 0:
+                            break
+                        written += sent
+                except OSError:
+                    pass  # e.g. macOS only allows sockets as the destination
+            # Most files go out in a single write; larger ones loop until the kernel has taken everything
+            while written < len(view):
+                written += os.write(fd, view[written:])
+    finally:
+        os.close(fd)
+
+def decode_name(raw_name):
+    """Decode an ASCII name from the names directory, or return None if it is not ASCII."""
+    try:
+        return raw_name.decode('ascii')
+    except UnicodeDecodeError:
+        return None
 
 class DSPackFile:
+    # Progress lines collected before they are written out as one block
+    flush_threshold = 100
+
     def __init__(self, filename):
         self.filename = filename
         self.file = None
+        self.mapping = None
+        self.view = None
+        self.output_buffers = queue.LifoQueue()  # Decompression buffers reused across files
         self.sections = []
         self.file_size = 0
         self.magic = None
         self.version = None
         self.flags = None
         self.section_count = 0
+        self.parsed = False
+        self.folder_paths = None  # Filled in once by build_folder_paths
+        self._msg_batch = []
         
     def __enter__(self):
         self.file = open(self.filename, 'rb')
         self.file_size = os.path.getsize(self.filename)
+        if self.file_size > 0:
+            # File data is sliced straight out of the mapping instead of seek+read
+            self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.mapping)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush_messages()
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.mapping is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                pass  # A slice is still referenced (e.g. by a traceback); it unmaps once freed
+            self.mapping = None
         if self.file:
             self.file.close()
 
+    def print_message(self, message):
+        """Report progress a batch of lines at a time; subclasses can redirect this (e.g. to a GUI log)."""
+        self._msg_batch.append(message)
+        if len(self._msg_batch) >= self.flush_threshold:
+            self.flush_messages()
+
+    def flush_messages(self):
+        """Write the collected progress lines to stdout in one call."""
+        if self._msg_batch:
+            batch, self._msg_batch = self._msg_batch, []
+            sys.stdout.write("\n".join(batch) + "\n")
+
+    def print_fmt(self, fmt, *args):
+        """
+        Report a per-entry detail line built with fmt.format(*args); subclasses
+        can skip formatting entirely when they do not show these lines.
+        """
+        self.print_message(fmt.format(*args))
+
     def validate_offset(self, offset, description=""):
         """Validate that an offset is within the file bounds."""
         if offset < 0 or offset >= self.file_size:
@@ -182,11 +442,11 @@ class DSPackFile:
             
     def read_header(self):
         """Read the file header."""
-        self.file.seek(0)
+        header = self.view[:HEADER_SIZE] if self.view is not None else b''
         
         # Read magic numbers
-        magic1 = self.file.read(4)  # "mgf "
-        magic2 = self.file.read(4)  # [8,1,90,90]
+        magic1 = bytes(header[0:4])  # "mgf "
+        magic2 = bytes(header[4:8])  # [8,1,90,90]
         
         if magic1 != b'mgf ' or magic2 != bytes([8, 1, 90, 90]):
             # Try big endian format
@@ -196,121 +456,120 @@ class DSPackFile:
         else:
             self.big_endian = False
             
-        # Skip 4 bytes null padding
-        self.file.read(4)
-        
-        # Read counts and offsets
-        if self.big_endian:
-            self.num_files = self.validate_count(struct.unpack('>I', self.file.read(4))[0], "num_files")
-            self.file_dir_length = self.validate_length(struct.unpack('>I', self.file.read(4))[0], "file_dir_length")
-            self.file_dir_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], "file_dir_offset")
-            self.num_folders = self.validate_count(struct.unpack('>I', self.file.read(4))[0], "num_folders")
-            self.folder_dir_length = self.validate_length(struct.unpack('>I', self.file.read(4))[0], "folder_dir_length")
-            self.folder_dir_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], "folder_dir_offset")
-            self.names_dir_length = self.validate_length(struct.unpack('>I', self.file.read(4))[0], "names_dir_length")
-            self.names_dir_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], "names_dir_offset")
-        else:
-            self.num_files = self.validate_count(struct.unpack('<I', self.file.read(4))[0], "num_files")
-            self.file_dir_length = self.validate_length(struct.unpack('<I', self.file.read(4))[0], "file_dir_length")
-            self.file_dir_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], "file_dir_offset")
-            self.num_folders = self.validate_count(struct.unpack('<I', self.file.read(4))[0], "num_folders")
-            self.folder_dir_length = self.validate_length(struct.unpack('<I', self.file.read(4))[0], "folder_dir_length")
-            self.folder_dir_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], "folder_dir_offset")
-            self.names_dir_length = self.validate_length(struct.unpack('<I', self.file.read(4))[0], "names_dir_length")
-            self.names_dir_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], "names_dir_offset")
-        
-        print(f"[Directory Info]")
-        print(f"  * Files: {self.num_files}")
-        print(f"  * Folders: {self.num_folders}")
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Truncated header: {len(header)} of {HEADER_SIZE} bytes")
+        
+        # Read counts and offsets, after 4 bytes null padding
+        (num_files, file_dir_length, file_dir_offset,
+         num_folders, folder_dir_length, folder_dir_offset,
+         names_dir_length, names_dir_offset) = HEADER_STRUCTS[self.big_endian].unpack_from(header, 12)
+        self.num_files = self.validate_count(num_files, "num_files")
+        self.file_dir_length = self.validate_length(file_dir_length, "file_dir_length")
+        self.file_dir_offset = self.validate_offset(file_dir_offset, "file_dir_offset")
+        self.num_folders = self.validate_count(num_folders, "num_folders")
+        self.folder_dir_length = self.validate_length(folder_dir_length, "folder_dir_length")
+        self.folder_dir_offset = self.validate_offset(folder_dir_offset, "folder_dir_offset")
+        self.names_dir_length = self.validate_length(names_dir_length, "names_dir_length")
+        self.names_dir_offset = self.validate_offset(names_dir_offset, "names_dir_offset")
+        
+        self.print_message(f"[Directory Info]")
+        self.print_message(f"  * Files: {self.num_files}")
+        self.print_message(f"  * Folders: {self.num_folders}")
 
     def read_names_directory(self):
-        """Read the names directory into memory."""
-        self.file.seek(self.names_dir_offset)
-        self.names_data = self.file.read(self.names_dir_length)
+        """Read the names directory into memory and index the strings in it by offset."""
+        self.names_data = bytes(self.view[self.names_dir_offset:self.names_dir_offset + self.names_dir_length])
+        
+        # One split finds every terminator; entries point at the start of a string
+        try:
+            # Names are normally all ASCII: decode the directory in one call, text offsets match byte offsets
+            pieces = names = self.names_data.decode('ascii').split('\x00')
+        except UnicodeDecodeError:
+            pieces = self.names_data.split(b'\x00')
+            names = list(map(decode_name, pieces))
+        starts = accumulate((len(piece) + 1 for piece in pieces), initial=0)
+        self.name_index = dict(zip(starts, names))
+        self.name_index.pop(len(self.names_data), None)  # The empty piece after a trailing terminator
         
     def read_string_at_offset(self, offset):
         """Read a null-terminated string from the names directory at the given offset."""
+        if offset in self.name_index:
+            return self.name_index[offset]
         if offset >= len(self.names_data):
             return None
         
-        end = offset
-        while end < len(self.names_data) and self.names_data[end] != 0:
-            end += 1
-            
-        try:
-            return self.names_data[offset:end].decode('ascii')
-        except:
-            return None
+        # Offsets into the middle of a string are not indexed
+        end = self.names_data.find(b'\x00', offset)
+        if end == -1:
+            end = len(self.names_data)
+        return decode_name(self.names_data[offset:end])
+
+    def read_entry_table(self, offset, count, entry_struct, description=""):
+        """Unpack count consecutive entries of entry_struct at offset, sliced from the mapping in one go."""
+        size = count * entry_struct.size
+        table = self.view[offset:offset + size] if count else b''
+        if len(table) < size:
+            raise ValueError(f"Truncated {description}: {len(table)} of {size} bytes at offset {offset}")
+        return entry_struct.iter_unpack(table)
 
     def read_file_entries(self):
-        """Read the file entries from the file directory."""
-        self.file.seek(self.file_dir_offset)
-        self.files = []
-        
-        for i in range(self.num_files):
-            # Read file entry
-            if self.big_endian:
-                name_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], f"filename_offset_{i}")
-                parent_folder = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-                decompressed_size = self.validate_length(struct.unpack('>I', self.file.read(4))[0], f"decompressed_size_{i}")
-                compressed_size = self.validate_compressed_length(struct.unpack('>I', self.file.read(4))[0], f"compressed_size_{i}")
-                unknown = struct.unpack('>I', self.file.read(4))[0]
-                data_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], f"data_offset_{i}")
-            else:
-                name_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], f"filename_offset_{i}")
-                parent_folder = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-                decompressed_size = self.validate_length(struct.unpack('<I', self.file.read(4))[0], f"decompressed_size_{i}")
-                compressed_size = self.validate_compressed_length(struct.unpack('<I', self.file.read(4))[0], f"compressed_size_{i}")
-                unknown = struct.unpack('<I', self.file.read(4))[0]
-                data_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], f"data_offset_{i}")
-            
-            # Validate parent folder reference
-            if parent_folder != -1 and (parent_folder < 0 or parent_folder >= self.num_folders):
-                raise ValueError(f"Invalid parent folder {parent_folder} for file {i}")
-                
+        """
+        Read the file entries from the file directory into one column per field:
+        file_names, file_parent_folders, file_decompressed_sizes, file_compressed_sizes,
+        file_unknowns and file_data_offsets, all indexed by file number.
+        """
+        entries = list(self.read_entry_table(self.file_dir_offset, self.num_files,
+                                             FILE_ENTRY_STRUCTS[self.big_endian], "file directory"))
+        columns = tuple(zip(*entries)) if entries else ((),) * 6
+        name_offsets, parent_folders, decompressed_sizes, compressed_sizes, unknowns, data_offsets = columns
+        # Range-check whole columns at C speed; only a failure needs the per-entry checks
+        if entries and not (max(name_offsets) < self.file_size and max(data_offsets) < self.file_size and
+                            max(compressed_sizes) <= self.file_size and
+                            min(parent_folders) >= -1 and max(parent_folders) < self.num_folders):
+            for i, entry in enumerate(entries):
+                self.validate_file_entry(i, *entry)
+        
+        self.file_names = []
+        for i, name_offset in enumerate(name_offsets):
             name = self.read_string_at_offset(name_offset)
             if not name:
                 raise ValueError(f"Invalid filename at offset {name_offset} for file {i}")
-            
-            self.files.append({
-                'name': name,
-                'parent_folder': parent_folder,
-                'decompressed_size': decompressed_size,
-                'compressed_size': compressed_size,
-                'unknown': unknown,
-                'data_offset': data_offset
-            })
+            self.file_names.append(name)
+        self.file_parent_folders = parent_folders
+        self.file_decompressed_sizes = decompressed_sizes
+        self.file_compressed_sizes = compressed_sizes
+        self.file_unknowns = unknowns
+        self.file_data_offsets = data_offsets
+
+    def validate_file_entry(self, i, name_offset, parent_folder, decompressed_size, compressed_size,
+                            unknown, data_offset):
+        """Check every field of file entry i, raising ValueError for the first one out of range."""
+        self.validate_offset(name_offset, f"filename_offset_{i}")
+        self.validate_length(decompressed_size, f"decompressed_size_{i}")
+        self.validate_compressed_length(compressed_size, f"compressed_size_{i}")
+        self.validate_offset(data_offset, f"data_offset_{i}")
+        
+        # Validate parent folder reference
+        if parent_folder != -1 and (parent_folder < 0 or parent_folder >= self.num_folders):
+            raise ValueError(f"Invalid parent folder {parent_folder} for file {i}")
 
     def read_folder_entries(self):
         """Read the folder entries from the folder directory."""
-        self.file.seek(self.folder_dir_offset)
-        self.folders = []
+        entries = list(self.read_entry_table(self.folder_dir_offset, self.num_folders,
+                                             FOLDER_ENTRY_STRUCTS[self.big_endian], "folder directory"))
+        if entries:
+            # Range-check whole columns at C speed; only a failure needs the per-entry checks
+            name_offsets, parent_folders, _, _, first_files, last_files = zip(*entries)
+            if not (max(name_offsets) < self.file_size and
+                    min(parent_folders) >= -1 and max(parent_folders) < self.num_folders and
+                    min(first_files) >= -1 and max(first_files) <= self.num_files and
+                    min(last_files) >= -1 and max(last_files) <= self.num_files):
+                for i, entry in enumerate(entries):
+                    self.validate_folder_entry(i, *entry)
         
-        for i in range(self.num_folders):
-            # Read folder entry
-            if self.big_endian:
-                name_offset = self.validate_offset(struct.unpack('>I', self.file.read(4))[0], f"foldername_offset_{i}")
-                parent_folder = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-                last_subfolder = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-                first_subfolder = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-                first_file = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-                last_file = struct.unpack('>i', self.file.read(4))[0]  # Signed for -1
-            else:
-                name_offset = self.validate_offset(struct.unpack('<I', self.file.read(4))[0], f"foldername_offset_{i}")
-                parent_folder = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-                last_subfolder = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-                first_subfolder = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-                first_file = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-                last_file = struct.unpack('<i', self.file.read(4))[0]  # Signed for -1
-            
-            # Validate references
-            if parent_folder != -1 and (parent_folder < 0 or parent_folder >= self.num_folders):
-                raise ValueError(f"Invalid parent folder {parent_folder} for folder {i}")
-            if first_file != -1 and (first_file < -1 or first_file > self.num_files):
-                raise ValueError(f"Invalid first file {first_file} for folder {i}")
-            if last_file != -1 and (last_file < -1 or last_file > self.num_files):
-                raise ValueError(f"Invalid last file {last_file} for folder {i}")
-            
+        self.folders = []
+        for i, (name_offset, parent_folder, last_subfolder, first_subfolder,
+                first_file, last_file) in enumerate(entries):
             name = self.read_string_at_offset(name_offset)
             if not name:
                 raise ValueError(f"Invalid folder name at offset {name_offset} for folder {i}")
@@ -324,132 +583,235 @@ class DSPackFile:
                 'last_file': last_file
             })
 
-    def build_folder_paths(self):
-        """Build full paths for folders by following parent links."""
-        folder_paths = {}
+    def validate_folder_entry(self, i, name_offset, parent_folder, last_subfolder, first_subfolder,
+                              first_file, last_file):
+        """Check the references of folder entry i, raising ValueError for the first one out of range."""
+        self.validate_offset(name_offset, f"foldername_offset_{i}")
         
-        def get_folder_path(index):
-            if index in folder_paths:
-                return folder_paths[index]
-                
-            folder = self.folders[index]
-            if folder['parent_folder'] == -1:
-                path = folder['name']
-            else:
-                parent_path = get_folder_path(folder['parent_folder'])
-                path = f"{parent_path}/{folder['name']}"
-            
-            folder_paths[index] = path
-            return path
-            
-        for i in range(len(self.folders)):
-            folder_paths[i] = get_folder_path(i)
-            
-        return folder_paths
+        # Validate references
+        if parent_folder != -1 and (parent_folder < 0 or parent_folder >= self.num_folders):
+            raise ValueError(f"Invalid parent folder {parent_folder} for folder {i}")
+        if first_file != -1 and (first_file < -1 or first_file > self.num_files):
+            raise ValueError(f"Invalid first file {first_file} for folder {i}")
+        if last_file != -1 and (last_file < -1 or last_file > self.num_files):
+            raise ValueError(f"Invalid last file {last_file} for folder {i}")
+
+    def iter_folder_paths(self):
+        """
+        Yield (index, path) for each folder as its path is resolved from the parent links.
+        A full pass stores the paths for build_folder_paths, and later passes yield those.
+        """
+        if self.folder_paths is not None:
+            yield from self.folder_paths.items()
+            return
+        names = [folder['name'] for folder in self.folders]
+        parents = [folder['parent_folder'] for folder in self.folders]
+        folder_paths = [None] * len(names)  # Parents are looked up again by their children
+        
+        for i in range(len(names)):
+            # Climb to the nearest folder with a known path (or past the root), then fill in on the way down
+            chain = []
+            j = i
+            while j != -1 and folder_paths[j] is None:
+                if len(chain) == len(names):
+                    raise ValueError(f"Folder {i} has a cyclic parent chain")
+                chain.append(j)
+                j = parents[j]
+            path = folder_paths[j] if j != -1 else None
+            for k in reversed(chain):
+                path = names[k] if path is None else f"{path}/{names[k]}"
+                folder_paths[k] = path
+            yield i, folder_paths[i]
+        self.folder_paths = dict(enumerate(folder_paths))
+
+    def build_folder_paths(self):
+        """Build full paths for folders by following parent links; reuses the paths analyze resolved."""
+        if self.folder_paths is None:
+            for _ in self.iter_folder_paths():
+                pass
+        return self.folder_paths
 
-    def extract_file(self, file_entry):
-        """Extract a single file from the archive."""
-        if file_entry['compressed_size'] == 0:
+    def take_output_buffer(self, size):
+        """Return a pooled decompression buffer of at least size bytes."""
+        try:
+            buffer = self.output_buffers.get_nowait()
+        except queue.Empty:
+            buffer = None
+        if buffer is None or len(buffer) < size:
+            # Smaller pooled buffers are dropped; this one replaces them
+            buffer = bytearray(max(size, OUTPUT_BUFFER_MIN_SIZE))
+        return buffer
+
+    def return_output_buffer(self, buffer):
+        """Hand a buffer from take_output_buffer back for the next file."""
+        self.output_buffers.put(buffer)
+
+    def extract_file(self, data_offset, compressed_size, decompressed_size, output_buffer=None, messages=None):
+        """
+        Extract a single file from the archive, given its entry's data offset and sizes.
+        Compressed files are decompressed into output_buffer when it is large enough;
+        the returned data then is a view of it, valid until the buffer is reused.
+        With a messages list, progress is appended to it as (method, args) for the
+        caller to report later instead of being reported straight away.
+        """
+        def report(method, *args):
+            if messages is None:
+                method(*args)
+            else:
+                messages.append((method, args))
+        
+        if compressed_size == 0:
             return None, False
         
-        # Read the compressed data
-        self.file.seek(file_entry['data_offset'])
-        compressed_data = self.file.read(file_entry['compressed_size'])
+        # Slice the compressed data out of the mapped archive without copying
+        compressed_data = self.view[data_offset:data_offset + compressed_size]
         
         # If the file is not compressed, return it as-is
-        if file_entry['compressed_size'] == file_entry['decompressed_size']:
-            print("  > File is not compressed")
+        if compressed_size == decompressed_size:
+            report(self.print_fmt, "  > File is not compressed")
             return compressed_data, False
         
         # Basic validation check: ensure compressed data is smaller than decompressed size
-        if len(compressed_data) >= file_entry['decompressed_size']:
-            print("(!!) Invalid compression: compressed size larger than decompressed size")
+        if len(compressed_data) >= decompressed_size:
+            report(self.print_message, "(!!) Invalid compression: compressed size larger than decompressed size")
             return compressed_data, True
         
         # Try to decompress the data
         try:
-            decompressor = MiniPackDecompressor()
-            data = decompressor.decompress(compressed_data, file_entry['decompressed_size'])
-            print(f"  > Successfully decompressed ({file_entry['compressed_size']:,} -> {len(data):,} bytes)")
+            if output_buffer is not None and len(output_buffer) >= decompressed_size:
+                data = memoryview(output_buffer)[:decompressed_size]
+            else:
+                data = bytearray(decompressed_size)
+            decompress_minipack_into(compressed_data, data)
+            report(self.print_fmt, "  > Successfully decompressed ({:,} -> {:,} bytes)", compressed_size, len(data))
             return data, False
         except IndexError:
             # For bytearray index out of range errors, extract the file as-is
-            print("(!!) Unknown compression format: extracting as-is")
+            report(self.print_message, "(!!) Unknown compression format: extracting as-is")
             return compressed_data, True
         except (KeyboardInterrupt, Exception) as e:
-            print(f"(!!) Decompression error: {str(e)}")
+            report(self.print_message, f"(!!) Decompression error: {str(e)}")
             return compressed_data, True
 
-    def extract_all_files(self, output_dir):
-        """Extract all files to the specified directory."""
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # First build folder paths
-        folder_paths = self.build_folder_paths()
-        
-        # Create folder structure
-        for folder_idx, path in folder_paths.items():
-            # Convert forward slashes to backslashes and remove leading/trailing slashes
-            clean_path = path.strip('/').replace('/', os.path.sep)
-            folder_path = os.path.join(output_dir, clean_path)
-            os.makedirs(folder_path, exist_ok=True)
-        
-        # Extract files
-        total_files = len(self.files)
-        for idx, file_entry in enumerate(self.files, 1):
-            if file_entry['parent_folder'] >= 0:
-                folder_path = folder_paths[file_entry['parent_folder']].strip('/').replace('/', os.path.sep)
-                output_path = os.path.join(output_dir, folder_path, file_entry['name'])
-            else:
-                output_path = os.path.join(output_dir, file_entry['name'])
-                
-            print(f"[{idx}/{total_files}] {file_entry['name']}")
-            
-            data, is_compressed = self.extract_file(file_entry)
+    def extract_entry(self, output_path, data_offset, compressed_size, decompressed_size):
+        """
+        Extract one file to output_path; runs on the extraction threads.
+        Returns the file's progress messages as (method, args) pairs, in order.
+        """
+        messages = []
+        # Only files that get decompressed need an output buffer
+        output_buffer = None
+        if 0 < compressed_size < decompressed_size:
+            output_buffer = self.take_output_buffer(decompressed_size)
+        try:
+            data, is_compressed = self.extract_file(data_offset, compressed_size, decompressed_size,
+                                                    output_buffer, messages)
             if data:
                 if is_compressed:
                     # Add [Compressed] tag before the extension
                     base, ext = os.path.splitext(output_path)
                     output_path = f"{base}[Compressed]{ext}"
                 
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, 'wb') as f:
-                    f.write(data)
+                if isinstance(data, memoryview) and data.obj is self.mapping:
+                    # Data left as stored is a slice of the mapping and can be copied by the kernel
+                    write_output_file(output_path, data, self.file.fileno(), data_offset)
+                else:
+                    write_output_file(output_path, data)
             else:
-                print("  - Failed to extract")
+                messages.append((self.print_message, ("  - Failed to extract",)))
+        finally:
+            data = None  # Drop the view before the buffer is handed out again
+            if output_buffer is not None:
+                self.return_output_buffer(output_buffer)
+        return messages
 
-    def analyze(self):
-        """Analyze the DSPack file."""
-        # Read all directory structures
+    def extract_all_files(self, output_dir, workers=EXTRACT_WORKERS):
+        """
+        Extract all files to the specified directory, on up to workers threads;
+        callers already extracting several archives at once pass fewer.
+        """
+        self.parse()  # Already done when analyze ran first
+        
+        # Each folder path is turned into a directory once
+        folder_paths = self.build_folder_paths()
+        folder_dirs = {folder_idx: os.path.join(output_dir, path.strip('/').replace('/', os.path.sep))
+                       for folder_idx, path in folder_paths.items()}
+        
+        output_paths = []
+        for name, parent_folder in zip(self.file_names, self.file_parent_folders):
+            if parent_folder >= 0:
+                output_paths.append(os.path.join(folder_dirs[parent_folder], name))
+            else:
+                output_paths.append(os.path.join(output_dir, name))
+        
+        # Create folder structure, each directory once; names may carry their own subfolders
+        directories = {os.fspath(output_dir)}
+        directories.update(folder_dirs.values())
+        directories.update(os.path.dirname(path) for path in output_paths)
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+        
+        # Extract files on a thread pool; the compiled decoder and the file writes release the GIL.
+        # Progress is reported from here, in file order.
+        total_files = self.num_files
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            entries = zip(output_paths, self.file_data_offsets,
+                          self.file_compressed_sizes, self.file_decompressed_sizes)
+            for output_path, data_offset, compressed_size, decompressed_size in entries:
+                futures.append(executor.submit(self.extract_entry, output_path, data_offset,
+                                               compressed_size, decompressed_size))
+            
+            try:
+                for idx, (name, future) in enumerate(zip(self.file_names, futures), 1):
+                    self.print_fmt("[{}/{}] {}", idx, total_files, name)
+                    for method, args in future.result():
+                        method(*args)
+            except BaseException:
+                # Don't start the files still queued
+                for future in futures:
+                    future.cancel()
+                raise
+        self.flush_messages()
+
+    def parse(self):
+        """Read the header and all directory structures; later calls reuse what was read."""
+        if self.parsed:
+            return
         self.read_header()
         self.read_names_directory()
         self.read_file_entries()
         self.read_folder_entries()
-        
-        # Build folder paths
-        folder_paths = self.build_folder_paths()
+        self.parsed = True
+
+    def analyze(self):
+        """Analyze the DSPack file."""
+        # Read all directory structures
+        self.parse()
         
         # Print analysis
-        print(f"\n[Archive Analysis: {os.path.basename(self.filename)}]")
-        print(f"=" * 50)
-        print(f"Format: {'Big-endian' if self.big_endian else 'Little-endian'}")
-        print(f"Files: {len(self.files)}")
-        print(f"Folders: {len(self.folders)}")
-        
-        print("\n[Folder Structure]")
-        for i, path in folder_paths.items():
+        self.print_message(f"\n[Archive Analysis: {os.path.basename(self.filename)}]")
+        self.print_message("=" * 50)
+        self.print_message(f"Format: {'Big-endian' if self.big_endian else 'Little-endian'}")
+        self.print_message(f"Files: {self.num_files}")
+        self.print_message(f"Folders: {len(self.folders)}")
+        
+        self.print_message("\n[Folder Structure]")
+        for i, path in self.iter_folder_paths():
             folder = self.folders[i]
             file_count = folder['last_file'] - folder['first_file'] + 1 if folder['first_file'] >= 0 else 0
-            print(f"  {path}/ ({file_count} files)")
+            self.print_fmt("  {}/ ({} files)", path, file_count)
         
-        print("\n[Sample Files]")
-        for file in self.files[:5]:  # Show first 5 files
-            comp_ratio = (1 - file['compressed_size'] / file['decompressed_size']) * 100 if file['decompressed_size'] > 0 else 0
-            print(f"  * {file['name']}")
-            print(f"    Size: {file['decompressed_size']:,} bytes")
+        self.print_message("\n[Sample Files]")
+        for i in range(min(self.num_files, 5)):  # Show first 5 files
+            decompressed_size = self.file_decompressed_sizes[i]
+            comp_ratio = (1 - self.file_compressed_sizes[i] / decompressed_size) * 100 if decompressed_size > 0 else 0
+            self.print_message(f"  * {self.file_names[i]}")
+            self.print_message(f"    Size: {decompressed_size:,} bytes")
             if comp_ratio > 0:
-                print(f"    Compression: {comp_ratio:.1f}%")
-            print()
+                self.print_message(f"    Compression: {comp_ratio:.1f}%")
+            self.print_message("")
+        self.flush_messages()
 
 def analyze_dspack_files(directory):
     """Analyze all .dsPack files in a directory."""
@@ -476,7 +838,6 @@ def analyze_dspack_files(directory):
         print(f"(!) Error scanning directory: {str(e)}")
 
 if __name__ == '__main__':
-    import sys
     import argparse
     
     parser = argparse.ArgumentParser(description='Analyze and extract files from .dsPack archives')